@@ -1,14 +1,56 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
+from email.utils import parsedate_to_datetime
 from urllib.parse import urlencode, parse_qs, urlparse
 import webbrowser
 from http.server import HTTPServer, BaseHTTPRequestHandler
+import random
 import threading
 import time
 from token_manager import TokenManager
 
+# 可重试的HTTP状态码（限流与服务端临时错误）
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# 进程内共享的连接池会话，按连接池大小区分
+_shared_sessions = {}
+_shared_sessions_lock = threading.Lock()
+
+
+def get_shared_session(pool_size=10):
+    """获取进程内共享的keep-alive会话（线程安全）"""
+    with _shared_sessions_lock:
+        session = _shared_sessions.get(pool_size)
+        if session is None:
+            session = requests.Session()
+            # 重试由InoreaderClient自行处理，这里只负责连接池
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _shared_sessions[pool_size] = session
+        return session
+
+
+def _parse_retry_after(value):
+    """解析Retry-After响应头（秒数或HTTP日期），返回等待秒数"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
 class InoreaderClient:
-    def __init__(self, client_id, client_secret, redirect_uri="http://localhost:8080/callback"):
+    def __init__(self, client_id, client_secret, redirect_uri="http://localhost:8080/callback",
+                 pool_size=10, max_retries=3, backoff_factor=0.5, max_backoff=30.0,
+                 timeout=(5, 30)):
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
@@ -16,6 +58,15 @@ class InoreaderClient:
         self.refresh_token = None
         self.base_url = "https://www.inoreader.com"
         self.token_manager = TokenManager()
+        # 并发抓取时多个线程共享同一客户端，令牌刷新须串行
+        self._refresh_lock = threading.Lock()
+        
+        # HTTP连接池与重试配置
+        self.session = get_shared_session(pool_size)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
         
         # 尝试加载保存的令牌
         self._load_saved_tokens()
@@ -36,6 +87,33 @@ class InoreaderClient:
                 self.access_token = token_data['access_token']
                 self.refresh_token = token_data['refresh_token']
     
+    def _request(self, method, url, **kwargs):
+        """通过共享会话发送请求，对429/5xx和连接错误做带抖动的指数退避重试"""
+        kwargs.setdefault('timeout', self.timeout)
+        
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                response = None
+            
+            if response is not None and response.status_code not in RETRYABLE_STATUS_CODES:
+                return response
+            if response is not None and attempt >= self.max_retries:
+                return response
+            
+            # 优先遵循服务端的Retry-After，否则使用带抖动的指数退避
+            delay = None
+            if response is not None:
+                delay = _parse_retry_after(response.headers.get('Retry-After'))
+            if delay is None:
+                delay = random.uniform(0, self.backoff_factor * (2 ** attempt))
+            time.sleep(min(delay, self.max_backoff))
+        
+        return response
+    
     def is_authenticated(self):
         """检查是否已认证"""
         return self.access_token is not None
@@ -68,7 +146,7 @@ class InoreaderClient:
             'User-Agent': 'InoreaderClient/1.0'
         }
         
-        response = requests.post(token_url, data=data, headers=headers)
+        response = self._request('POST', token_url, data=data, headers=headers)
         if response.status_code == 200:
             token_data = response.json()
             self.access_token = token_data.get('access_token')
@@ -82,8 +160,18 @@ class InoreaderClient:
         else:
             raise Exception(f"Token exchange failed: {response.status_code} - {response.text}")
     
-    def refresh_access_token(self):
-        """刷新访问令牌"""
+    def refresh_access_token(self, stale_token=None):
+        """刷新访问令牌
+        
+        stale_token: 被服务端拒绝的访问令牌；若加锁后发现其他线程已将其替换，
+        则直接复用新令牌而不再刷新（返回None）
+        """
+        with self._refresh_lock:
+            if stale_token is not None and self.access_token and self.access_token != stale_token:
+                return None
+            return self._refresh_access_token_locked()
+    
+    def _refresh_access_token_locked(self):
         if not self.refresh_token:
             raise Exception("No refresh token available")
             
@@ -100,10 +188,12 @@ class InoreaderClient:
             'User-Agent': 'InoreaderClient/1.0'
         }
         
-        response = requests.post(token_url, data=data, headers=headers)
+        response = self._request('POST', token_url, data=data, headers=headers)
         if response.status_code == 200:
             token_data = response.json()
             self.access_token = token_data.get('access_token')
+            # 服务端轮换refresh token时使用新的
+            self.refresh_token = token_data.get('refresh_token') or self.refresh_token
             
             # 保存刷新后的令牌
             expires_in = token_data.get('expires_in', 3600)
@@ -115,31 +205,32 @@ class InoreaderClient:
     
     def _make_authenticated_request(self, endpoint, method='GET', params=None, data=None):
         """发送认证请求"""
-        if not self.access_token:
+        access_token = self.access_token
+        if not access_token:
             raise Exception("No access token available. Please authenticate first.")
         
         headers = {
-            'Authorization': f'Bearer {self.access_token}',
+            'Authorization': f'Bearer {access_token}',
             'Content-Type': 'application/json'
         }
         
         url = f"{self.base_url}/reader/api/0{endpoint}"
         
         if method == 'GET':
-            response = requests.get(url, headers=headers, params=params)
+            response = self._request('GET', url, headers=headers, params=params)
         elif method == 'POST':
-            response = requests.post(url, headers=headers, data=data)
+            response = self._request('POST', url, headers=headers, data=data)
         else:
             raise ValueError(f"Unsupported HTTP method: {method}")
         
         if response.status_code == 401:
             try:
-                self.refresh_access_token()
+                self.refresh_access_token(stale_token=access_token)
                 headers['Authorization'] = f'Bearer {self.access_token}'
                 if method == 'GET':
-                    response = requests.get(url, headers=headers, params=params)
+                    response = self._request('GET', url, headers=headers, params=params)
                 else:
-                    response = requests.post(url, headers=headers, data=data)
+                    response = self._request('POST', url, headers=headers, data=data)
             except:
                 raise Exception("Authentication failed. Please re-authenticate.")
         
@@ -164,7 +255,7 @@ class InoreaderClient:
             raise Exception(f"Failed to get user info: {response.status_code} - {response.text}")
     
     def get_unread_articles(self, stream_id="user/-/state/com.google/reading-list", 
-                           max_articles=None, include_read=False):
+                           max_articles=None, include_read=False, newer_than=None):
         """
         获取未读文章
         
@@ -172,6 +263,7 @@ class InoreaderClient:
         - stream_id: 流ID，默认获取所有订阅的文章
         - max_articles: 最大文章数，None表示获取所有
         - include_read: 是否包含已读文章，默认False（只获取未读）
+        - newer_than: Unix时间戳（秒），只获取该时间之后的文章，用于增量获取
         
         常用stream_id:
         - "user/-/state/com.google/reading-list": 所有订阅文章
@@ -192,6 +284,10 @@ class InoreaderClient:
             if not include_read:
                 params['xt'] = 'user/-/state/com.google/read'
             
+            # 只获取指定时间之后的文章
+            if newer_than:
+                params['ot'] = int(newer_than)
+            
             # 添加continuation参数用于分页
             if continuation:
                 params['c'] = continuation
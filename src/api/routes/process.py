@@ -13,6 +13,8 @@ from ...services.inoreader_service import InoreaderService
 from ...services.classification_service import ClassificationService
 from ...services.report_generator import ReportGenerator
 from ...services.adaptive_deduplication_service import AdaptiveDeduplicationService
+from ...services.reported_index import get_reported_index, daily_report_id
+from ...services.llm_cassette import is_replaying, REPLAY_API_KEY
 from ...utils.logger import get_logger
 from ...utils.config import get_settings, get_crypto_config
 
@@ -240,12 +242,15 @@ def ai_filter():
                 # Get API key
                 if provider == 'openai':
                     api_key = data.get('api_key') or settings.openai_api_key
-                    if not api_key:
-                        raise ValueError("OpenAI API key not configured")
+                elif provider == 'fake':
+                    api_key = 'fake'
                 else:
                     api_key = settings.deepseek_api_key
-                    if not api_key:
-                        raise ValueError("DeepSeek API key not configured")
+                if not api_key and is_replaying():
+                    # Replayed responses need no provider account
+                    api_key = REPLAY_API_KEY
+                if not api_key:
+                    raise ValueError(f"{'OpenAI' if provider == 'openai' else 'DeepSeek'} API key not configured")
                 
                 # Create original filter
                 filter_instance = AIFundingFilter(api_key, provider)
@@ -298,13 +303,50 @@ def ai_filter():
                 dedup_stats = {}
                 batch_size = 20
                 max_articles = None  # Process all
+                max_in_flight = int(data.get('max_in_flight', settings.ai_filter_max_in_flight))
+                token_budget = settings.ai_batch_token_budget
+                prefilter_threshold = float(data.get('prefilter_threshold', settings.ai_prefilter_threshold))
+                
+                # Only one representative per near-duplicate cluster goes to the AI filter
+                ai_inputs = {}
+                clusters = {}
+                prefilter_service = None
+                if prefilter_threshold > 0:
+                    prefilter_service = AdaptiveDeduplicationService(
+                        similarity_threshold=prefilter_threshold,
+                        performance_mode='aggressive'
+                    )
+                for category_name, articles, article_type in categories_config:
+                    if prefilter_service is None or not articles:
+                        ai_inputs[article_type] = articles
+                        continue
+                    representatives, clusters[article_type] = prefilter_service.collapse_near_duplicates(articles)
+                    ai_inputs[article_type] = representatives
+                    log_callback(f'{category_name}: {len(articles)} → {len(representatives)} after near-duplicate collapsing')
+                
+                # Concurrent mode: AI-filter batches of all categories up front
+                concurrent_results = None
+                if max_in_flight > 1:
+                    log_callback(f'Filtering all categories concurrently (max in-flight requests: {max_in_flight})...')
+                    concurrent_results = filter_instance.batch_filter_concurrent(
+                        {article_type: ai_inputs[article_type] for _, articles, article_type in categories_config if articles},
+                        batch_size, max_articles, max_in_flight, token_budget
+                    )
                 
                 for category_name, articles, article_type in categories_config:
                     if articles:
                         log_callback(f'Filtering {len(articles)} articles in {category_name}...')
                         
                         # Use original batch_filter method
-                        ai_filtered = filter_instance.batch_filter_no_prompt(articles, batch_size, max_articles, article_type)
+                        if concurrent_results is not None:
+                            ai_filtered = concurrent_results[article_type]
+                        else:
+                            ai_filtered = filter_instance.batch_filter_no_prompt(ai_inputs[article_type], batch_size, max_articles, article_type, token_budget)
+                        
+                        # Representatives' verdicts apply to their whole cluster
+                        if article_type in clusters:
+                            ai_filtered = prefilter_service.expand_representatives(
+                                ai_filtered, articles, clusters[article_type])
                         
                         # Apply adaptive deduplication
                         if ai_filtered:
@@ -312,7 +354,8 @@ def ai_filter():
                             # Use new adaptive deduplication service
                             adaptive_dedup_service = AdaptiveDeduplicationService(
                                 similarity_threshold=0.4,
-                                performance_mode='aggressive'
+                                performance_mode='aggressive',
+                                lsh_min_articles=settings.dedup_lsh_min_articles
                             )
                             deduplicated, dedup_stats_obj = adaptive_dedup_service.adaptive_deduplicate(ai_filtered, category_name)
                             filtered_results[article_type] = deduplicated
@@ -337,7 +380,8 @@ def ai_filter():
                     # Use new adaptive deduplication service for portfolios
                     adaptive_dedup_service = AdaptiveDeduplicationService(
                         similarity_threshold=0.4,
-                        performance_mode='aggressive'
+                        performance_mode='aggressive',
+                        lsh_min_articles=settings.dedup_lsh_min_articles
                     )
                     deduplicated_portfolio, portfolio_dedup_stats = adaptive_dedup_service.adaptive_deduplicate(portfolio_articles, "portfolios")
                     filtered_results["portfolio"] = deduplicated_portfolio
@@ -389,10 +433,21 @@ def ai_filter():
                     mapped_results[chinese_key] = articles
                     log_callback(f'{chinese_key}: {len(articles)} articles after filtering')
                 
+                # Drop stories an earlier report already covered
+                reported_dedup = None
+                report_id = daily_report_id()
+                reported_index = get_reported_index()
+                if reported_index is not None:
+                    reported_dedup = AdaptiveDeduplicationService(reported_index=reported_index)
+                    for chinese_key, articles in mapped_results.items():
+                        mapped_results[chinese_key], repeated = reported_dedup.suppress_reported(articles, report_id)
+                        if repeated:
+                            log_callback(f'{chinese_key}: {len(repeated)} articles already reported in the last {reported_index.retention_days} days')
+                
                 # Generate final report using ReportGenerator
                 log_callback('Generating structured report...')
                 # Create a simple AI service for report generation
-                ai_service = create_ai_service('openai', api_key) if api_key else None
+                ai_service = create_ai_service(provider if provider == 'fake' else 'openai', api_key) if api_key else None
                 report_generator = ReportGenerator(ai_service=ai_service)
                 report_content = report_generator.generate_report(mapped_results)
                 
@@ -404,6 +459,8 @@ def ai_filter():
                     f.write(report_content)
                 
                 log_callback(f'Report saved to: {report_file}')
+                if reported_dedup is not None:
+                    reported_dedup.record_reported([article for articles in mapped_results.values() for article in articles], report_id)
                 process_status['ai_filter']['progress'] = 100
                 log_callback('AI filtering completed successfully!')
                 
@@ -11,6 +11,9 @@ from ..services.ai_service import AIService
 from ..services.email_service import EmailService
 from ..services.report_generator import ReportGenerator
 from ..services.adaptive_deduplication_service import AdaptiveDeduplicationService
+from ..services.llm_cache import get_llm_cache
+from ..services.llm_cassette import get_llm_cassette, is_replaying, REPLAY_API_KEY
+from ..services.reported_index import get_reported_index, daily_report_id
 from ..utils.config import get_settings, get_crypto_config
 from ..utils.logger import get_logger
 
@@ -79,6 +82,17 @@ class NewsProcessor:
             
             if progress_callback:
                 progress_callback(80, "AI filtering completed")
+            
+            # Drop stories an earlier report already covered
+            reported_dedup = None
+            report_id = daily_report_id()
+            reported_index = get_reported_index()
+            if reported_index is not None:
+                reported_dedup = AdaptiveDeduplicationService(reported_index=reported_index)
+                matches = reported_dedup.find_reported([article.to_dict() for article in filtered_articles], report_id)
+                repeated = sum(match is not None for match in matches)
+                filtered_articles = [article for article, match in zip(filtered_articles, matches) if match is None]
+                logger.info(f"Already reported in the last {reported_index.retention_days} days: {repeated} articles dropped")
                 
             # Step 4: Generate report
             if progress_callback:
@@ -87,6 +101,8 @@ class NewsProcessor:
                 log_callback("生成结构化报告...")
                 
             report = self._generate_report(filtered_articles)
+            if reported_dedup is not None:
+                reported_dedup.record_reported([article.to_dict() for article in filtered_articles], report_id)
             
             # Step 5: Send email if requested
             if recipient_email and self.email_service:
@@ -113,6 +129,10 @@ class NewsProcessor:
             
             report.processing_stats = self.processing_stats
             
+            cassette = get_llm_cassette()
+            if cassette is not None:
+                logger.info(f"LLM cassette: {cassette.get_stats()}")
+            
             if progress_callback:
                 progress_callback(100, "Pipeline completed")
             if log_callback:
@@ -224,6 +244,9 @@ class NewsProcessor:
             # Create original filter instance
             api_key = self.ai_service.api_key if hasattr(self.ai_service, 'api_key') else None
             provider = getattr(self.ai_service, 'provider', 'openai')
+            if not api_key and is_replaying():
+                # Replayed responses need no provider account
+                api_key = REPLAY_API_KEY
             
             if not api_key:
                 logger.warning("No API key available for AI filtering, skipping AI filter")
@@ -260,6 +283,35 @@ class NewsProcessor:
             filtered_results = {}
             batch_size = 20
             max_articles = None
+            max_in_flight = self.settings.ai_filter_max_in_flight
+            token_budget = self.settings.ai_batch_token_budget
+            
+            # Only one representative per near-duplicate cluster goes to the AI filter
+            ai_inputs = {}
+            clusters = {}
+            prefilter_service = None
+            if self.settings.ai_prefilter_threshold > 0:
+                prefilter_service = AdaptiveDeduplicationService(
+                    similarity_threshold=self.settings.ai_prefilter_threshold,
+                    performance_mode='aggressive'
+                )
+            for category_name, category_articles in categorized.items():
+                if prefilter_service is None or category_name == "portfolios" or not category_articles:
+                    ai_inputs[category_name] = category_articles
+                    continue
+                representatives, clusters[category_name] = prefilter_service.collapse_near_duplicates(category_articles)
+                ai_inputs[category_name] = representatives
+                logger.info(f"{category_name} near-duplicate collapsing: {len(category_articles)} → {len(representatives)} sent to AI filter")
+            
+            # Concurrent mode: AI-filter batches of all categories up front
+            concurrent_results = None
+            if max_in_flight > 1:
+                concurrent_results = filter_instance.batch_filter_concurrent(
+                    {category_mapping.get(name, name): ai_inputs[name]
+                     for name, category_articles in categorized.items()
+                     if name != "portfolios" and category_articles},
+                    batch_size, max_articles, max_in_flight, token_budget
+                )
             
             for category_name, category_articles in categorized.items():
                 if category_articles:
@@ -271,21 +323,31 @@ class NewsProcessor:
                         # Use new adaptive deduplication service for portfolios
                         adaptive_dedup_service = AdaptiveDeduplicationService(
                             similarity_threshold=0.4,
-                            performance_mode='aggressive'
+                            performance_mode='aggressive',
+                            lsh_min_articles=self.settings.dedup_lsh_min_articles
                         )
                         deduplicated, dedup_stats = adaptive_dedup_service.adaptive_deduplicate(category_articles, "portfolios")
                         filtered_results[article_type] = deduplicated
                         logger.info(f"Portfolio deduplication: {dedup_stats.total_articles} → {len(deduplicated)} (removed: {dedup_stats.total_removed})")
                     else:
                         # Use original batch_filter method
-                        ai_filtered = filter_instance.batch_filter_no_prompt(category_articles, batch_size, max_articles, article_type)
+                        if concurrent_results is not None:
+                            ai_filtered = concurrent_results[article_type]
+                        else:
+                            ai_filtered = filter_instance.batch_filter_no_prompt(ai_inputs[category_name], batch_size, max_articles, article_type, token_budget)
+                        
+                        # Representatives' verdicts apply to their whole cluster
+                        if category_name in clusters:
+                            ai_filtered = prefilter_service.expand_representatives(
+                                ai_filtered, category_articles, clusters[category_name])
                         
                         # Apply adaptive deduplication
                         if ai_filtered:
                             # Use new adaptive deduplication service
                             adaptive_dedup_service = AdaptiveDeduplicationService(
                                 similarity_threshold=0.4,
-                                performance_mode='aggressive'
+                                performance_mode='aggressive',
+                                lsh_min_articles=self.settings.dedup_lsh_min_articles
                             )
                             deduplicated, dedup_stats = adaptive_dedup_service.adaptive_deduplicate(ai_filtered, category_name)
                             filtered_results[article_type] = deduplicated
@@ -323,6 +385,9 @@ class NewsProcessor:
                             break
             
             logger.info(f"AI filtering completed: {len(final_articles)} articles remaining")
+            llm_cache = get_llm_cache()
+            if llm_cache is not None:
+                logger.info(f"LLM response cache: {llm_cache.get_stats()}")
             return final_articles
             
         except Exception as e:
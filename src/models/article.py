@@ -6,6 +6,8 @@ from enum import Enum
 from typing import Optional, Dict, Any
 import hashlib
 
+from ..utils.keyword_matcher import get_phrase_matcher
+
 
 class ArticleStatus(Enum):
     """Article processing status"""
@@ -120,8 +122,8 @@ class Article:
     
     def is_portfolio_related(self, portfolio_projects: list) -> bool:
         """Check if article is related to portfolio projects"""
-        text = f"{self.title} {self.content_text}".lower()
-        return any(project.lower() in text for project in portfolio_projects)
+        text = f"{self.title} {self.content_text}"
+        return get_phrase_matcher(portfolio_projects).contains_any(text)
     
     def get_content_preview(self, max_length: int = 200) -> str:
         """Get truncated content preview"""
@@ -10,14 +10,14 @@ from enum import Enum
 # Import available components
 try:
     from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
     import numpy as np
+    from .sparse_similarity import blockwise_cosine_similarity
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
 
 try:
-    from openai import OpenAI
+    from .llm_clients import get_llm_client
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
@@ -29,8 +29,192 @@ try:
 except ImportError:
     JIEBA_AVAILABLE = False
 
+try:
+    from .minhash_lsh import MinHashLSH
+    MINHASH_AVAILABLE = True
+except ImportError:
+    MINHASH_AVAILABLE = False
+
 import re
 import json
+from functools import lru_cache
+
+from .rate_limiter import chat_completion
+from .reported_index import ReportedFingerprintIndex, simhash, daily_report_id
+
+
+# Titles whose features stay cached across runs and categories
+TITLE_FEATURE_CACHE_SIZE = 8192
+
+# Normalize company name variations
+_COMPANY_MAPPINGS = [(re.compile(pattern), replacement) for pattern, replacement in [
+    (r'the clearing company', 'the clearing'),
+    (r'the clearing(?!\s+company)', 'the clearing'),
+    (r'swarm network', 'swarm network'),
+    (r'union square ventures', 'usv'),
+    (r'polymarket', 'polymarket'),
+    (r'kalshi', 'kalshi')
+]]
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'[^\W\u4e00-\u9fff]+')
+_CJK_RUN_RE = re.compile(r'[\u4e00-\u9fff]+')
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+_LATIN_WORD_RE = re.compile(r'[a-z]+')
+# Lead-ins reposting outlets put in front of a story
+_REPOST_PREFIX_RE = re.compile(r'^(?:快讯|消息|独家|突发|据报道|breaking|update)\s*')
+
+# Funding amount with comprehensive patterns
+_AMOUNT_PATTERNS = [re.compile(pattern) for pattern in [
+    # Chinese formats
+    r'(\d+(?:\.\d+)?)\s*万美元',
+    r'(\d+(?:\.\d+)?)\s*千万美元',
+    r'(\d+(?:\.\d+)?)\s*百万美元',
+    r'(\d+(?:\.\d+)?)\s*亿美元',
+    
+    # English formats
+    r'(\d+(?:\.\d+)?)\s*million',
+    r'(\d+(?:\.\d+)?)\s*billion',
+    
+    # Mixed formats common in crypto news
+    r'(\d+(?:\.\d+)?)\s*万\s*美元',
+    r'(\d+(?:\.\d+)?)\s*千万\s*美元',
+    r'(\d+(?:\.\d+)?)\s*百万\s*美元',
+    r'(\d+(?:\.\d+)?)\s*亿\s*美元',
+    
+    # More flexible patterns
+    r'完成\s*(?:.*?)?(\d+(?:\.\d+)?)\s*万美元',
+    r'融资\s*(?:.*?)?(\d+(?:\.\d+)?)\s*万美元',
+    r'获得\s*(?:.*?)?(\d+(?:\.\d+)?)\s*万美元',
+    
+    # Match specific amounts from our duplicates
+    r'(1500)\s*万美元',  # The Clearing, Everlyn
+    r'(1300)\s*万美元',  # Swarm Network
+    r'(2000)\s*万美元',  # aPriori
+]]
+
+# Round type; the matched pattern text is the feature value
+_ROUND_PATTERNS = [(pattern, re.compile(pattern)) for pattern in [
+    r'种子轮', r'seed', r'pre-seed',
+    r'a轮', r'series a', r'a round',
+    r'b轮', r'series b', r'b round',
+    r'c轮', r'series c', r'c round'
+]]
+
+# Key company names with comprehensive patterns
+_COMPANY_PATTERNS = [re.compile(pattern) for pattern in [
+    # Specific companies that often appear
+    r'(the clearing(?:\s+company)?)',
+    r'(swarm network)',
+    r'(polymarket)',
+    r'(kalshi)',
+    r'(everlyn)',
+    r'(apriori)',
+    r'(portal to bitcoin)',
+    r'(multipli)',
+    r'(rain)',
+    r'(hemi)',
+    r'(kira)',
+    r'(gondor)',
+    r'(panora)',
+    r'(centrifuge)',
+    r'(tazapay)',
+    r'(suzaku)',
+    r'(credit coop)',
+    r'(obita)',
+    r'(magne\.ai)',
+    r'(finchain)',
+    r'(metafyed)',
+    
+    # Generic patterns for other companies
+    r'([a-z]+\s+network)',
+    r'([a-z]+\s+protocol)',
+    r'([a-z]+\s+labs)',
+    r'([a-z]+\s+capital)',
+    r'([a-z]+\s+ventures)',
+    r'([a-z]+\s+ai)',
+    
+    # Single word companies (more flexible)
+    r'\b([A-Z][a-z]{3,})\b(?=\s+(?:完成|获得|宣布|融资))'
+]]
+
+# Lead investors
+_INVESTOR_PATTERNS = [re.compile(pattern) for pattern in [
+    r'(usv)', r'(union square ventures)',
+    r'(sui)', r'(ghaf capital)',
+    r'(coinbase ventures)',
+    r'([a-z]+\s+ventures)',
+    r'([a-z]+\s+capital)'
+]]
+
+
+@dataclass(frozen=True)
+class TitleFeatures:
+    """Everything the similarity layers need from one title, computed once"""
+    clean: str
+    company: str
+    amount: str
+    round_type: str
+    investors: str
+    shingles: frozenset  # MinHash shingles, see _shingles
+
+
+def _shingles(clean: str) -> frozenset:
+    """
+    Character bigrams of every Chinese run (a lone character stands for
+    itself) plus the Latin words and numbers, so a Chinese title and its
+    mixed-script variant share most of their shingles
+    """
+    shingles = set(_WORD_RE.findall(clean))
+    for run in _CJK_RUN_RE.findall(clean):
+        if len(run) == 1:
+            shingles.add(run)
+        shingles.update(run[i:i + 2] for i in range(len(run) - 1))
+    return frozenset(shingles)
+
+
+def _first_group(patterns, text: str) -> str:
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    return ''
+
+
+@lru_cache(maxsize=TITLE_FEATURE_CACHE_SIZE)
+def title_features(title: str) -> TitleFeatures:
+    """Cleaned title and funding features of a financial news title"""
+    clean = title.lower().strip()
+    for pattern, replacement in _COMPANY_MAPPINGS:
+        clean = pattern.sub(replacement, clean)
+    # Remove punctuation and normalize spaces
+    clean = _PUNCTUATION_RE.sub(' ', clean)
+    clean = _WHITESPACE_RE.sub(' ', clean).strip()
+    
+    title_lower = title.lower()
+    
+    amount = ''
+    for pattern in _AMOUNT_PATTERNS:
+        match = pattern.search(title_lower)
+        if match:
+            amount = match.group(1)
+            break
+    
+    round_type = next((text for text, pattern in _ROUND_PATTERNS if pattern.search(title_lower)), '')
+    
+    company = _first_group(_COMPANY_PATTERNS, title_lower).lower()
+    # Normalize some common variations
+    if 'clearing' in company:
+        company = 'the clearing'
+    
+    return TitleFeatures(
+        clean=clean,
+        company=company,
+        amount=amount,
+        round_type=round_type,
+        investors=_first_group(_INVESTOR_PATTERNS, title_lower),
+        shingles=_shingles(clean)
+    )
 
 
 class DeduplicationMethod(Enum):
@@ -42,6 +226,7 @@ class DeduplicationMethod(Enum):
     AI_SEMANTIC = "ai_semantic"
     HYBRID = "hybrid"
     PROGRESSIVE_MULTILAYER = "progressive_multilayer"
+    MINHASH_LSH = "minhash_lsh"
 
 
 @dataclass
@@ -51,6 +236,7 @@ class AdaptiveStats:
     exact_removed: int = 0
     similarity_removed: int = 0
     ai_removed: int = 0
+    reported_removed: int = 0
     processing_time: float = 0.0
     method_used: str = ""
     algorithm_selection_time: float = 0.0
@@ -59,7 +245,7 @@ class AdaptiveStats:
     
     @property
     def total_removed(self) -> int:
-        return self.exact_removed + self.similarity_removed + self.ai_removed
+        return self.exact_removed + self.similarity_removed + self.ai_removed + self.reported_removed
     
     @property
     def removal_rate(self) -> float:
@@ -75,12 +261,19 @@ class AdaptiveDeduplicationService:
                  similarity_threshold: float = 0.6,  # Lowered from 0.7 for more aggressive deduplication
                  ai_api_key: Optional[str] = None,
                  ai_provider: str = "openai",
-                 performance_mode: str = "aggressive"):  # Changed default to aggressive mode
+                 performance_mode: str = "aggressive",  # Changed default to aggressive mode
+                 reported_index: Optional[ReportedFingerprintIndex] = None,
+                 lsh_min_articles: int = 0):
         
         self.similarity_threshold = similarity_threshold
         self.ai_api_key = ai_api_key
         self.ai_provider = ai_provider
         self.performance_mode = performance_mode
+        # Articles of earlier reports; matches are dropped before deduplication
+        self.reported_index = reported_index
+        # Opt-in: batches of at least this many articles may use the approximate
+        # MinHash/LSH method, which never compares pairs it does not propose (0 = off)
+        self.lsh_min_articles = lsh_min_articles
         
         # Algorithm selection thresholds
         self.thresholds = self._get_performance_thresholds(performance_mode)
@@ -108,7 +301,11 @@ class AdaptiveDeduplicationService:
                 "accuracy_weight": 0.2,
                 "speed_weight": 0.5,
                 "tfidf_threshold": 0.65,
-                "ai_threshold": 0.75
+                "ai_threshold": 0.75,
+                "grey_band_min": 0.0,  # >0 skips pairs below this TF-IDF cosine (faster, approximate)
+                "lsh_bands": 24,  # MinHash/LSH banding, see lsh_min_articles
+
+                "lsh_rows": 3
             },
             "accuracy": {
                 "vectorization_min": 20,   # Lower threshold for accuracy mode
@@ -118,7 +315,10 @@ class AdaptiveDeduplicationService:
                 "accuracy_weight": 0.6,
                 "speed_weight": 0.2,
                 "tfidf_threshold": 0.55,
-                "ai_threshold": 0.7
+                "ai_threshold": 0.7,
+                "grey_band_min": 0.0,
+                "lsh_bands": 64,  # More bands: fewer missed pairs, more candidates
+                "lsh_rows": 2
             },
             "balanced": {
                 "vectorization_min": 30,   # Balanced thresholds
@@ -128,7 +328,10 @@ class AdaptiveDeduplicationService:
                 "accuracy_weight": 0.35,
                 "speed_weight": 0.3,
                 "tfidf_threshold": 0.6,
-                "ai_threshold": 0.72
+                "ai_threshold": 0.72,
+                "grey_band_min": 0.0,
+                "lsh_bands": 32,
+                "lsh_rows": 3
             },
             "aggressive": {  # New aggressive mode for maximum deduplication
                 "vectorization_min": 15,   # Very low threshold - use AI more
@@ -138,7 +341,10 @@ class AdaptiveDeduplicationService:
                 "accuracy_weight": 0.7,  # Prioritize accuracy over speed
                 "speed_weight": 0.1,
                 "tfidf_threshold": 0.4,  # Even more aggressive TF-IDF (was 0.5)
-                "ai_threshold": 0.6      # More aggressive AI (was 0.7)
+                "ai_threshold": 0.6,     # More aggressive AI (was 0.7)
+                "grey_band_min": 0.0,
+                "lsh_bands": 32,
+                "lsh_rows": 3
             }
         }
         
@@ -163,15 +369,15 @@ class AdaptiveDeduplicationService:
             self.tfidf_vectorizer = None
         
         # AI client
-        if OPENAI_AVAILABLE and self.ai_api_key:
+        if OPENAI_AVAILABLE and (self.ai_api_key or self.ai_provider == "fake"):
             if self.ai_provider == "deepseek":
-                self.ai_client = OpenAI(
-                    api_key=self.ai_api_key,
-                    base_url="https://api.deepseek.com"
-                )
+                self.ai_client = get_llm_client("deepseek", self.ai_api_key)
                 self.ai_model = "deepseek-chat"
+            elif self.ai_provider == "fake":
+                self.ai_client = get_llm_client("fake", self.ai_api_key)
+                self.ai_model = "fake-llm"
             else:
-                self.ai_client = OpenAI(api_key=self.ai_api_key)
+                self.ai_client = get_llm_client("openai", self.ai_api_key)
                 self.ai_model = "gpt-4o-mini"
         else:
             self.ai_client = None
@@ -183,6 +389,9 @@ class AdaptiveDeduplicationService:
         if SKLEARN_AVAILABLE:
             methods.append("tfidf_vectorized")
         
+        if MINHASH_AVAILABLE:
+            methods.append("minhash_lsh")
+        
         if self.ai_client:
             methods.append("ai_semantic")
             methods.append("hybrid")
@@ -247,6 +456,15 @@ class AdaptiveDeduplicationService:
         
         print(f"🧠 Starting adaptive deduplication for {len(articles)} articles...")
         
+        # Phase 0: Stories already covered by an earlier report
+        if self.reported_index is not None:
+            articles, suppressed = self.suppress_reported(articles)
+            stats.reported_removed = len(suppressed)
+            print(f"   🗂️ Already reported: {len(suppressed)} articles")
+            if not articles:
+                stats.processing_time = time.time() - start_time
+                return articles, stats
+        
         # Phase 1: Algorithm Selection
         selection_start = time.time()
         selected_method = self._select_optimal_algorithm(articles, category_name)
@@ -273,6 +491,205 @@ class AdaptiveDeduplicationService:
         
         return result_articles, stats
     
+    def collapse_near_duplicates(self, articles: List[Dict]) -> Tuple[List[Dict], List[List[Dict]]]:
+        """
+        Cluster near-duplicate articles before AI filtering
+        
+        Each article joins the first earlier cluster representative whose title
+        hashes the same, or that mentions the same numbers, names no different
+        entity (see ``_names_conflict``) and reaches ``similarity_threshold``
+        (enhanced similarity, TF-IDF as secondary signal like the vectorized
+        method). Only candidate pairs (see ``_collapse_candidates``) are
+        scored. A representative's AI verdict is applied to its whole
+        cluster, so this is stricter than deduplication. Returns the
+        representatives in order and the clusters, each starting with its
+        representative.
+        """
+        if len(articles) < 2:
+            return list(articles), [[article] for article in articles]
+        
+        features = [self._title_features(article.get('title', '')) for article in articles]
+        clean_titles = [f.clean for f in features]
+        numbers = [frozenset(_NUMBER_RE.findall(title)) for title in clean_titles]
+        earlier = self._collapse_candidates(features)
+        
+        clusters: List[List[Dict]] = []
+        cluster_of_representative: Dict[int, int] = {}
+        cluster_by_hash: Dict[str, int] = {}
+        
+        for j, article in enumerate(articles):
+            title_hash = hashlib.md5(clean_titles[j].encode('utf-8')).hexdigest()
+            cluster_index = cluster_by_hash.get(title_hash)
+            
+            if cluster_index is None:
+                # Representatives are earlier articles, so ascending i is cluster order
+                candidates = cluster_of_representative if earlier is None else sorted(earlier[j])
+                for i in candidates:
+                    if i not in cluster_of_representative:
+                        continue
+                    if numbers[i] != numbers[j] or self._features_conflict(features[i], features[j]):
+                        continue
+                    if self._names_conflict(clean_titles[i], clean_titles[j]):
+                        continue
+                    if ((earlier is not None and earlier[j][i] * 0.8 >= self.similarity_threshold)
+                            or self._features_similarity(features[i], features[j]) >= self.similarity_threshold):
+                        cluster_index = cluster_of_representative[i]
+                        break
+            
+            if cluster_index is None:
+                cluster_index = len(clusters)
+                clusters.append([])
+                cluster_of_representative[j] = cluster_index
+            cluster_by_hash.setdefault(title_hash, cluster_index)
+            clusters[cluster_index].append(article)
+        
+        return [cluster[0] for cluster in clusters], clusters
+    
+    def _collapse_candidates(self, features: List[TitleFeatures]) -> Optional[List[Dict[int, float]]]:
+        """
+        For every article j, {i: TF-IDF cosine} of the earlier articles worth scoring
+        
+        Candidates are TF-IDF neighbours at the grey band floor (or MinHash/LSH
+        buckets without scikit-learn) plus titles sharing company and amount
+        or round; the cosine is 0.0 where TF-IDF did not propose the pair.
+        None when neither backend is available: every pair is scored.
+        """
+        n = len(features)
+        forward: List[List[int]] = [[] for _ in range(n)]
+        earlier: Optional[List[Dict[int, float]]] = None
+        
+        if SKLEARN_AVAILABLE:
+            try:
+                similarity = blockwise_cosine_similarity(
+                    self.tfidf_vectorizer.fit_transform([f.clean for f in features]),
+                    self.thresholds.get('grey_band_min', 0.0))
+                # Transposed rows list each article's earlier neighbours
+                earlier = self._similar_pairs(similarity.T.tocsr().tocoo())
+            except Exception as e:
+                print(f"         ⚠️ TF-IDF failed: {e}, using MinHash/LSH candidates")
+        
+        if earlier is None:
+            if not MINHASH_AVAILABLE:
+                return None
+            lsh = MinHashLSH(bands=self.thresholds.get('lsh_bands', 32), rows=self.thresholds.get('lsh_rows', 3))
+            forward = lsh.candidate_pairs(lsh.signatures([f.shingles for f in features]))
+            earlier = [{} for _ in range(n)]
+        
+        self._add_feature_candidates(features, forward)
+        for i, js in enumerate(forward):
+            for j in js:
+                earlier[j].setdefault(i, 0.0)
+        return earlier
+    
+    def reported_fingerprint(self, title: str) -> int:
+        """SimHash of a title's shingles (repost lead-ins removed) plus its company, amount and round"""
+        features = self._title_features(title)
+        weights = {shingle: 1.0 for shingle in _shingles(_REPOST_PREFIX_RE.sub('', features.clean))}
+        # Funding features outweigh single shingles, so rewordings of one deal stay close
+        for feature in ('company', 'amount', 'round_type'):
+            value = getattr(features, feature)
+            if value:
+                weights[f'{feature}:{value}'] = 3.0
+        return simhash(weights)
+    
+    @staticmethod
+    def _reported_feature_key(features: TitleFeatures) -> str:
+        """Company and amount of a funding title ('' unless both are known)"""
+        return f"{features.company}|{features.amount}" if features.company and features.amount else ''
+    
+    @staticmethod
+    def _article_key(article: Dict) -> str:
+        return article.get('id') or article.get('title', '')
+    
+    def find_reported(self, articles: List[Dict], report_id: Optional[str] = None) -> List[Optional[Dict]]:
+        """
+        For every article, the entry of an earlier report it repeats, or None
+        
+        Entries within the index's Hamming distance or naming the same deal
+        must also reach ``similarity_threshold`` (enhanced similarity of the
+        titles). Entries recorded for ``report_id`` itself (default: today's
+        daily report) do not count, so re-running a report does not suppress
+        its own articles, while an article of the rolling window that went
+        into an earlier report is suppressed even though its id is unchanged.
+        """
+        if self.reported_index is None:
+            return [None] * len(articles)
+        if report_id is None:
+            report_id = daily_report_id()
+        
+        matches = []
+        for article in articles:
+            title = article.get('title', '')
+            features = self._title_features(title)
+            match = None
+            for entry in self.reported_index.find(self.reported_fingerprint(title), self._reported_feature_key(features)):
+                if entry['report_id'] == report_id:
+                    continue
+                if self._features_similarity(features, self._title_features(entry['title'])) >= self.similarity_threshold:
+                    match = entry
+                    break
+            matches.append(match)
+        return matches
+    
+    def suppress_reported(self, articles: List[Dict], report_id: Optional[str] = None) -> Tuple[List[Dict], List[Dict]]:
+        """Split articles into (new, already in an earlier report)"""
+        fresh, suppressed = [], []
+        for article, match in zip(articles, self.find_reported(articles, report_id)):
+            (fresh if match is None else suppressed).append(article)
+        return fresh, suppressed
+    
+    def record_reported(self, articles: List[Dict], report_id: Optional[str] = None):
+        """Add articles that went into report ``report_id`` (default: today's) to the reported index"""
+        if self.reported_index is None or not articles:
+            return
+        entries = []
+        for article in articles:
+            title = article.get('title', '')
+            entries.append((self.reported_fingerprint(title), self._article_key(article), title,
+                            self._reported_feature_key(self._title_features(title))))
+        self.reported_index.add_many(entries, report_id if report_id is not None else daily_report_id())
+    
+    @staticmethod
+    def _features_conflict(features1: TitleFeatures, features2: TitleFeatures) -> bool:
+        """True when both titles name a different company, amount or round"""
+        for feature in ('company', 'amount', 'round_type'):
+            value1, value2 = getattr(features1, feature), getattr(features2, feature)
+            if value1 and value2 and value1 != value2:
+                return True
+        return False
+    
+    @staticmethod
+    def _names_conflict(clean1: str, clean2: str) -> bool:
+        """
+        True when the titles likely name different entities: their Latin-script
+        words differ, or each has a run of 2+ Chinese characters the other lacks
+        (e.g. 贝莱德 vs 富达), while one-sided extras (加密项目, 价格) are allowed
+        """
+        if set(_LATIN_WORD_RE.findall(clean1)) != set(_LATIN_WORD_RE.findall(clean2)):
+            return True
+        
+        def has_unique_run(title: str, other: str) -> bool:
+            run = 0
+            for char in title:
+                if '\u4e00' <= char <= '\u9fff' and char not in other:
+                    run += 1
+                    if run >= 2:
+                        return True
+                else:
+                    run = 0
+            return False
+        
+        return has_unique_run(clean1, clean2) and has_unique_run(clean2, clean1)
+    
+    @staticmethod
+    def expand_representatives(kept: List[Dict], articles: List[Dict],
+                               clusters: List[List[Dict]]) -> List[Dict]:
+        """Articles whose cluster representative is in ``kept``, in original order"""
+        kept_ids = {id(article) for article in kept}
+        kept_members = {id(member) for cluster in clusters if id(cluster[0]) in kept_ids
+                        for member in cluster}
+        return [article for article in articles if id(article) in kept_members]
+    
     def _select_optimal_algorithm(self, articles: List[Dict], category: str) -> DeduplicationMethod:
         """Intelligent algorithm selection based on data characteristics"""
         
@@ -304,6 +721,10 @@ class AdaptiveDeduplicationService:
         if self.ai_client and SKLEARN_AVAILABLE and n_articles <= self.thresholds["ai_max"]:
             algorithm_scores[DeduplicationMethod.HYBRID] = self._score_hybrid(n_articles, characteristics)
         
+        # MinHash/LSH method (near-linear but approximate, for large historical dedups)
+        if MINHASH_AVAILABLE and self.lsh_min_articles and n_articles >= self.lsh_min_articles:
+            algorithm_scores[DeduplicationMethod.MINHASH_LSH] = self._score_minhash_lsh(n_articles, characteristics)
+        
         # Progressive multilayer method (if AI available - best for aggressive deduplication)
         if self.ai_client and SKLEARN_AVAILABLE:
             algorithm_scores[DeduplicationMethod.PROGRESSIVE_MULTILAYER] = self._score_progressive_multilayer(n_articles, characteristics)
@@ -477,6 +898,22 @@ class AdaptiveDeduplicationService:
         total_score = score + chinese_bonus + density_bonus + aggressive_bonus
         return min(1.0, total_score)  # Cap at 1.0
     
+    def _score_minhash_lsh(self, n_articles: int, characteristics: Dict) -> float:
+        """Score MinHash/LSH algorithm - only offered from lsh_min_articles on"""
+        # Cost grows with the number of articles, not the number of pairs
+        speed_score = 1.0
+        accuracy_score = 0.85  # Pairs sharing no LSH bucket or funding feature are never compared
+        complexity_score = 0.5
+        
+        # Past lsh_min_articles the all-pairs methods (and AI layers) stop being practical
+        scale_bonus = 0.4
+        
+        score = (speed_score * self.thresholds["speed_weight"] + 
+                accuracy_score * self.thresholds["accuracy_weight"] +
+                complexity_score * self.thresholds["complexity_weight"])
+        
+        return score + scale_bonus
+    
     def _execute_algorithm(self, articles: List[Dict], method: DeduplicationMethod, stats: AdaptiveStats) -> Tuple[List[Dict], Dict]:
         """Execute the selected deduplication algorithm"""
         
@@ -494,6 +931,8 @@ class AdaptiveDeduplicationService:
             return self._hybrid_dedup(articles, stats)
         elif method == DeduplicationMethod.PROGRESSIVE_MULTILAYER:
             return self._progressive_multilayer_dedup(articles, stats)
+        elif method == DeduplicationMethod.MINHASH_LSH:
+            return self._minhash_lsh_dedup(articles, stats)
         else:
             # Fallback to optimized sequential
             return self._optimized_sequential_dedup(articles, stats)
@@ -518,18 +957,15 @@ class AdaptiveDeduplicationService:
     def _basic_sequential_dedup(self, articles: List[Dict], stats: AdaptiveStats) -> Tuple[List[Dict], Dict]:
         """Basic O(n²) sequential deduplication"""
         unique_articles = []
-        seen_titles = []
+        seen_features = []
         
         for article in articles:
-            title = self._clean_title(article.get('title', ''))
+            features = self._title_features(article.get('title', ''))
             
             is_duplicate = False
-            for idx, seen_title in enumerate(seen_titles):
+            for seen in seen_features:
                 # Use enhanced similarity calculation
-                similarity = self._calculate_enhanced_similarity(
-                    article.get('title', ''), 
-                    unique_articles[idx].get('title', '') if idx < len(unique_articles) else article.get('title', '')
-                )
+                similarity = self._features_similarity(features, seen)
                 if similarity >= self.similarity_threshold:
                     is_duplicate = True
                     stats.similarity_removed += 1
@@ -537,7 +973,7 @@ class AdaptiveDeduplicationService:
             
             if not is_duplicate:
                 unique_articles.append(article)
-                seen_titles.append(title)
+                seen_features.append(features)
         
         return unique_articles, {}
     
@@ -550,30 +986,27 @@ class AdaptiveDeduplicationService:
             return unique_articles, {}
         
         # Phase 2: Similarity deduplication with optimizations
-        clean_titles = [self._clean_title(a.get('title', '')) for a in unique_articles]
+        features = [self._title_features(a.get('title', '')) for a in unique_articles]
         keep_indices = set(range(len(unique_articles)))
         
         for i in range(len(unique_articles)):
             if i not in keep_indices:
                 continue
                 
-            title_i = clean_titles[i]
+            title_i = features[i].clean
             
             for j in range(i + 1, len(unique_articles)):
                 if j not in keep_indices:
                     continue
                 
-                title_j = clean_titles[j]
+                title_j = features[j].clean
                 
                 # Quick pre-screening
                 if abs(len(title_i) - len(title_j)) > max(len(title_i), len(title_j)) * 0.3:
                     continue
                 
                 # Use enhanced similarity calculation
-                similarity = self._calculate_enhanced_similarity(
-                    unique_articles[i].get('title', ''), 
-                    unique_articles[j].get('title', '')
-                )
+                similarity = self._features_similarity(features[i], features[j])
                 if similarity >= self.similarity_threshold:
                     keep_indices.remove(j)
                     stats.similarity_removed += 1
@@ -594,40 +1027,101 @@ class AdaptiveDeduplicationService:
         
         try:
             # Phase 2: TF-IDF similarity
-            titles = [self._clean_title(a.get('title', '')) for a in unique_articles]
-            tfidf_matrix = self.tfidf_vectorizer.fit_transform(titles)
-            similarity_matrix = cosine_similarity(tfidf_matrix)
+            features = [self._title_features(a.get('title', '')) for a in unique_articles]
+            tfidf_matrix = self.tfidf_vectorizer.fit_transform([f.clean for f in features])
+            
+            # TF-IDF cosines; an optional grey band floor also restricts the candidates
+            grey_band_min = self.thresholds.get('grey_band_min', 0.0)
+            neighbours = self._similar_pairs(blockwise_cosine_similarity(tfidf_matrix, grey_band_min))
+            n = len(unique_articles)
             
-            # Find duplicates using enhanced similarity
+            # Keep first: each kept article removes later, not yet removed duplicates
             duplicate_indices = set()
-            for i in range(len(unique_articles)):
+            for i in range(n):
                 if i in duplicate_indices:
                     continue
-                for j in range(i + 1, len(unique_articles)):
-                    if j not in duplicate_indices:
-                        # Use enhanced similarity calculation instead of just cosine similarity
-                        enhanced_similarity = self._calculate_enhanced_similarity(
-                            unique_articles[i].get('title', ''),
-                            unique_articles[j].get('title', '')
-                        )
-                        
-                        # Also consider TF-IDF similarity as a secondary signal
-                        tfidf_similarity = similarity_matrix[i, j]
-                        
-                        # Combine both signals - if either indicates duplicate, it's likely a duplicate
-                        final_similarity = max(enhanced_similarity, tfidf_similarity * 0.8)  # Weight TF-IDF slightly lower
-                        
-                        if final_similarity >= self.similarity_threshold:
-                            duplicate_indices.add(j)
-                            stats.similarity_removed += 1
+                # Without a grey band floor every later article is a candidate
+                candidates = neighbours[i] if grey_band_min > 0 else range(i + 1, n)
+                for j in candidates:
+                    if j in duplicate_indices:
+                        continue
+                    # Final similarity is max(enhanced, TF-IDF * 0.8), so the TF-IDF
+                    # signal alone settles the pair when it clears the threshold;
+                    # the costly enhanced similarity only runs on the pairs it leaves open
+                    if (neighbours[i].get(j, 0.0) * 0.8 >= self.similarity_threshold
+                            or self._features_similarity(features[i], features[j]) >= self.similarity_threshold):
+                        duplicate_indices.add(j)
+                        stats.similarity_removed += 1
             
-            final_articles = [unique_articles[i] for i in range(len(unique_articles)) if i not in duplicate_indices]
+            final_articles = [unique_articles[i] for i in range(n) if i not in duplicate_indices]
             return final_articles, {}
             
         except Exception as e:
             print(f"         ⚠️ TF-IDF failed: {e}, fallback to sequential")
             return self._optimized_sequential_dedup(unique_articles, stats)
     
+    def _similar_pairs(self, similarity) -> List[Dict[int, float]]:
+        """For every row i, {j: similarity} of the entries of a row-sorted COO matrix, ascending in j"""
+        n = similarity.shape[0]
+        # Rows are sorted, so each row's entries are one slice
+        bounds = np.searchsorted(similarity.row, np.arange(n + 1))
+        cols = similarity.col.tolist()
+        values = similarity.data.tolist()
+        return [dict(zip(cols[bounds[i]:bounds[i + 1]], values[bounds[i]:bounds[i + 1]])) for i in range(n)]
+    
+    def _minhash_lsh_dedup(self, articles: List[Dict], stats: AdaptiveStats) -> Tuple[List[Dict], Dict]:
+        """MinHash/LSH deduplication: approximate, only the proposed candidate pairs are scored"""
+        if not MINHASH_AVAILABLE:
+            return self._optimized_sequential_dedup(articles, stats)
+        
+        # Phase 1: Hash deduplication
+        unique_articles, _ = self._hash_only_dedup(articles, stats)
+        
+        if len(unique_articles) <= 1:
+            return unique_articles, {}
+        
+        # Phase 2: Candidate pairs from LSH buckets plus shared funding features
+        features = [self._title_features(a.get('title', '')) for a in unique_articles]
+        lsh = MinHashLSH(bands=self.thresholds.get('lsh_bands', 32), rows=self.thresholds.get('lsh_rows', 3))
+        neighbours = lsh.candidate_pairs(lsh.signatures([f.shingles for f in features]))
+        self._add_feature_candidates(features, neighbours)
+        
+        # Keep first: each kept article removes later, not yet removed duplicates
+        duplicate_indices = set()
+        for i in range(len(unique_articles)):
+            if i in duplicate_indices:
+                continue
+            for j in neighbours[i]:
+                if j not in duplicate_indices and self._features_similarity(features[i], features[j]) >= self.similarity_threshold:
+                    duplicate_indices.add(j)
+                    stats.similarity_removed += 1
+        
+        final_articles = [unique_articles[i] for i in range(len(unique_articles)) if i not in duplicate_indices]
+        return final_articles, {'candidate_pairs': sum(len(row) for row in neighbours)}
+    
+    @staticmethod
+    def _add_feature_candidates(features: List[TitleFeatures], neighbours: List[List[int]]):
+        """
+        Add pairs naming the same company together with the same amount or
+        round to ``neighbours``: their feature score can carry the enhanced
+        similarity over the threshold even when the wording shares few shingles
+        """
+        groups: Dict[Tuple, List[int]] = {}
+        for index, f in enumerate(features):
+            if f.company and f.amount:
+                groups.setdefault(('amount', f.company, f.amount), []).append(index)
+            if f.company and f.round_type:
+                groups.setdefault(('round', f.company, f.round_type), []).append(index)
+        
+        extra = {i: set() for i in range(len(features))}
+        for members in groups.values():
+            for index, i in enumerate(members):
+                extra[i].update(members[index + 1:])
+        
+        for i, js in extra.items():
+            if js:
+                neighbours[i] = sorted(js.union(neighbours[i]))
+    
     def _ai_semantic_dedup(self, articles: List[Dict], stats: AdaptiveStats) -> Tuple[List[Dict], Dict]:
         """AI-powered semantic deduplication"""
         # Placeholder - in real implementation would use AI API
@@ -737,28 +1231,24 @@ class AdaptiveDeduplicationService:
             # Compute TF-IDF matrix
             tfidf_matrix = self.tfidf_vectorizer.fit_transform(texts)
             
-            # Compute similarity matrix
-            similarity_matrix = cosine_similarity(tfidf_matrix)
-            
             # Find duplicates using more aggressive approach
             to_remove = set()
             n = len(articles)
+            neighbours = self._similar_pairs(blockwise_cosine_similarity(tfidf_matrix, threshold))
             
             for i in range(n):
                 if i in to_remove:
                     continue
-                for j in range(i + 1, n):
+                for j in neighbours[i]:
                     if j in to_remove:
                         continue
                     
-                    similarity_score = similarity_matrix[i, j]
-                    if similarity_score >= threshold:
-                        # Remove the article with shorter title (less informative)
-                        if len(articles[i].get('title', '')) >= len(articles[j].get('title', '')):
-                            to_remove.add(j)
-                        else:
-                            to_remove.add(i)
-                            break
+                    # Remove the article with shorter title (less informative)
+                    if len(articles[i].get('title', '')) >= len(articles[j].get('title', '')):
+                        to_remove.add(j)
+                    else:
+                        to_remove.add(i)
+                        break
             
             # Create result list
             unique_articles = [articles[i] for i in range(n) if i not in to_remove]
@@ -803,7 +1293,7 @@ class AdaptiveDeduplicationService:
             # Create AI prompt for semantic similarity analysis
             prompt = self._create_ai_deduplication_prompt(titles)
             
-            response = self.ai_client.chat.completions.create(
+            response = chat_completion(self.ai_client, self.ai_provider,
                 model=self.ai_model,
                 messages=[{
                     "role": "system",
@@ -813,7 +1303,8 @@ class AdaptiveDeduplicationService:
                     "content": prompt
                 }],
                 temperature=0.1,
-                max_tokens=500
+                max_tokens=500,
+                use_cache=True  # Same titles, same groups: reuse the earlier answer
             )
             
             # Parse AI response
@@ -870,14 +1361,14 @@ class AdaptiveDeduplicationService:
     def _layer_sequential_fallback(self, articles: List[Dict], stats: AdaptiveStats, threshold: float) -> List[Dict]:
         """Fallback sequential deduplication for TF-IDF layer"""
         seen_articles = []
+        seen_features = []
         
         for article in articles:
-            title = article.get('title', '')
+            features = self._title_features(article.get('title', ''))
             is_duplicate = False
             
-            for seen_article in seen_articles:
-                seen_title = seen_article.get('title', '')
-                similarity = self._calculate_enhanced_similarity(article.get('title', ''), seen_article.get('title', ''))
+            for seen in seen_features:
+                similarity = self._features_similarity(features, seen)
                 
                 if similarity >= threshold:
                     stats.similarity_removed += 1
@@ -886,175 +1377,38 @@ class AdaptiveDeduplicationService:
             
             if not is_duplicate:
                 seen_articles.append(article)
+                seen_features.append(features)
         
         return seen_articles
     
+    def _title_features(self, title: str) -> TitleFeatures:
+        """Cleaned title and funding features of a title (memoized across runs)"""
+        return title_features(title)
+    
     def _clean_title(self, title: str) -> str:
         """Enhanced title cleaning for financial news"""
-        import re
-        title = title.lower().strip()
-        
-        # Normalize company name variations
-        company_mappings = {
-            r'the clearing company': 'the clearing',
-            r'the clearing(?!\s+company)': 'the clearing',
-            r'swarm network': 'swarm network',
-            r'union square ventures': 'usv',
-            r'polymarket': 'polymarket',
-            r'kalshi': 'kalshi'
-        }
-        
-        for pattern, replacement in company_mappings.items():
-            title = re.sub(pattern, replacement, title)
-        
-        # Remove punctuation and normalize spaces
-        title = re.sub(r'[^\w\s]', ' ', title)
-        title = re.sub(r'\s+', ' ', title).strip()
-        
-        return title
+        return title_features(title).clean
     
     def _extract_key_features(self, title: str) -> Dict[str, str]:
         """Extract key features from financing news titles"""
-        import re
-        features = {
-            'company': '',
-            'amount': '',
-            'round_type': '',
-            'investors': ''
+        features = title_features(title)
+        return {
+            'company': features.company,
+            'amount': features.amount,
+            'round_type': features.round_type,
+            'investors': features.investors
         }
-        
-        title_lower = title.lower()
-        
-        # Extract funding amount with comprehensive patterns
-        amount_patterns = [
-            # Chinese formats
-            r'(\d+(?:\.\d+)?)\s*万美元',
-            r'(\d+(?:\.\d+)?)\s*千万美元', 
-            r'(\d+(?:\.\d+)?)\s*百万美元',
-            r'(\d+(?:\.\d+)?)\s*亿美元',
-            
-            # English formats
-            r'(\d+(?:\.\d+)?)\s*million',
-            r'(\d+(?:\.\d+)?)\s*billion',
-            
-            # Mixed formats common in crypto news
-            r'(\d+(?:\.\d+)?)\s*万\s*美元',
-            r'(\d+(?:\.\d+)?)\s*千万\s*美元',
-            r'(\d+(?:\.\d+)?)\s*百万\s*美元',
-            r'(\d+(?:\.\d+)?)\s*亿\s*美元',
-            
-            # More flexible patterns
-            r'完成\s*(?:.*?)?(\d+(?:\.\d+)?)\s*万美元',
-            r'融资\s*(?:.*?)?(\d+(?:\.\d+)?)\s*万美元',
-            r'获得\s*(?:.*?)?(\d+(?:\.\d+)?)\s*万美元',
-            
-            # Match specific amounts from our duplicates
-            r'(1500)\s*万美元',  # The Clearing, Everlyn
-            r'(1300)\s*万美元',  # Swarm Network  
-            r'(2000)\s*万美元',  # aPriori
-        ]
-        
-        for pattern in amount_patterns:
-            match = re.search(pattern, title_lower)
-            if match:
-                amount = match.group(1)
-                # Normalize amount - convert to consistent format
-                features['amount'] = amount
-                break
-        
-        # Extract round type
-        round_patterns = [
-            r'种子轮', r'seed', r'pre-seed',
-            r'a轮', r'series a', r'a round',
-            r'b轮', r'series b', r'b round',
-            r'c轮', r'series c', r'c round'
-        ]
-        
-        for pattern in round_patterns:
-            if re.search(pattern, title_lower):
-                features['round_type'] = pattern
-                break
-        
-        # Extract key company names with comprehensive patterns
-        company_patterns = [
-            # Specific companies that often appear
-            r'(the clearing(?:\s+company)?)',
-            r'(swarm network)', 
-            r'(polymarket)',
-            r'(kalshi)',
-            r'(everlyn)',
-            r'(apriori)',
-            r'(portal to bitcoin)',
-            r'(multipli)',
-            r'(rain)',
-            r'(hemi)',
-            r'(kira)',
-            r'(gondor)',
-            r'(panora)',
-            r'(centrifuge)',
-            r'(tazapay)',
-            r'(suzaku)',
-            r'(credit coop)',
-            r'(obita)',
-            r'(magne\.ai)',
-            r'(finchain)',
-            r'(metafyed)',
-            
-            # Generic patterns for other companies
-            r'([a-z]+\s+network)',
-            r'([a-z]+\s+protocol)',
-            r'([a-z]+\s+labs)',
-            r'([a-z]+\s+capital)',
-            r'([a-z]+\s+ventures)',
-            r'([a-z]+\s+ai)',
-            
-            # Single word companies (more flexible)
-            r'\b([A-Z][a-z]{3,})\b(?=\s+(?:完成|获得|宣布|融资))'
-        ]
-        
-        for pattern in company_patterns:
-            match = re.search(pattern, title_lower)
-            if match:
-                company_name = match.group(1).strip().lower()
-                # Normalize some common variations
-                if 'clearing' in company_name:
-                    features['company'] = 'the clearing'
-                elif company_name == 'apriori':
-                    features['company'] = 'apriori'
-                else:
-                    features['company'] = company_name
-                break
-        
-        # Extract lead investors
-        investor_patterns = [
-            r'(usv)', r'(union square ventures)',
-            r'(sui)', r'(ghaf capital)',
-            r'(coinbase ventures)',
-            r'([a-z]+\s+ventures)',
-            r'([a-z]+\s+capital)'
-        ]
-        
-        for pattern in investor_patterns:
-            match = re.search(pattern, title_lower)
-            if match:
-                features['investors'] = match.group(1).strip()
-                break
-        
-        return features
     
     def _calculate_enhanced_similarity(self, title1: str, title2: str) -> float:
         """Enhanced similarity calculation for financial news"""
-        import difflib
-        
+        return self._features_similarity(title_features(title1), title_features(title2))
+    
+    def _features_similarity(self, features1: TitleFeatures, features2: TitleFeatures) -> float:
+        """Enhanced similarity of two precomputed feature rows"""
         # Traditional text similarity
-        clean1 = self._clean_title(title1)
-        clean2 = self._clean_title(title2)
-        text_similarity = difflib.SequenceMatcher(None, clean1, clean2).ratio()
+        text_similarity = difflib.SequenceMatcher(None, features1.clean, features2.clean).ratio()
         
         # Feature-based similarity
-        features1 = self._extract_key_features(title1)
-        features2 = self._extract_key_features(title2)
-        
         feature_score = 0.0
         feature_weights = {
             'company': 0.4,    # Company name match is very important
@@ -1064,12 +1418,14 @@ class AdaptiveDeduplicationService:
         }
         
         for feature, weight in feature_weights.items():
-            if features1[feature] and features2[feature]:
-                if features1[feature] == features2[feature]:
+            value1 = getattr(features1, feature)
+            value2 = getattr(features2, feature)
+            if value1 and value2:
+                if value1 == value2:
                     feature_score += weight
                 elif feature == 'company':
                     # Fuzzy match for company names
-                    company_sim = difflib.SequenceMatcher(None, features1[feature], features2[feature]).ratio()
+                    company_sim = difflib.SequenceMatcher(None, value1, value2).ratio()
                     if company_sim > 0.8:  # Very high threshold for company names
                         feature_score += weight * company_sim
         
@@ -5,14 +5,27 @@
 """
 
 import json
-import openai
-import time
 from datetime import datetime
 import os
 import re
 import yaml
 import difflib
-import time
+import hashlib
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# 从 SERVICE_PATH 作为顶层模块导入（或直接运行）时，同级服务仍按 src.services 包导入，
+# 与其他服务共享同一套限流器、缓存与客户端
+_PROJECT_ROOT = str(Path(__file__).resolve().parents[2])
+if _PROJECT_ROOT not in sys.path:
+    sys.path.append(_PROJECT_ROOT)
+
+from src.services.rate_limiter import chat_completion
+from src.services.llm_cassette import REPLAY_API_KEY, is_replaying
+from src.services.verdict_store import ArticleVerdictStore, default_verdict_path
+from src.services.batch_packer import pack_batches, id_list_max_tokens, MAX_BATCH_ARTICLES
+from src.services.llm_clients import get_llm_client
 
 class AIFundingFilter:
     # 类别名称映射 - 定义为类常量，避免代码重复
@@ -32,15 +45,23 @@ class AIFundingFilter:
         "portfolio": "Portfolio"
     }
     
+    # 只发送标题的类别（其他类别附带内容预览）
+    TITLE_ONLY_TYPES = ["project", "blockchain", "middleware", "defi", "rwa", "stablecoin", "application", "gamefi", "exchange_wallet", "ai_crypto", "depin"]
+    
     def __init__(self, api_key=None, provider="openai"):
         self.provider = provider.lower()
         self.api_key = api_key
+        self.verdict_store = None
 
         # 后台OpenAI API密钥 (请在这里配置您的OpenAI API密钥)
         # 方式1: 直接在代码中配置
         # self.deepseek_key = "sk-your-actual-deepseek-key-here"  
         # 方式2: 从环境变量读取
         self.deepseek_key = os.getenv('DEEPSEEK_API_KEY', 'sk-your-deepseek-key-here')
+        # 回放LLM录制（LLM_CASSETTE_MODE=replay）时无需真实密钥
+        replaying = is_replaying()
+        if replaying and self.deepseek_key == 'sk-your-deepseek-key-here':
+            self.deepseek_key = REPLAY_API_KEY
         
         if self.provider == "deepseek":
             # 使用DeepSeek API
@@ -56,12 +77,18 @@ class AIFundingFilter:
             self.model = "deepseek-chat"
             print("✅ 使用DeepSeek API")
             print(f"API密钥: {self.api_key[:10]}...")
+        elif self.provider == "fake":
+            # 本地确定性模拟LLM（压测/离线运行，见 fake_llm.py）
+            self.api_key = api_key or "fake"
+            self.base_url = None
+            self.model = "fake-llm"
+            print("✅ 使用本地模拟LLM (fake)")
         else:
             # 使用OpenAI API
             if api_key:
                 self.api_key = api_key
             else:
-                self.api_key = os.getenv('OPENAI_API_KEY')
+                self.api_key = os.getenv('OPENAI_API_KEY') or (REPLAY_API_KEY if replaying else None)
             if not self.api_key:
                 print("❌ 请提供OpenAI API密钥")
                 return
@@ -69,12 +96,8 @@ class AIFundingFilter:
             self.model = "gpt-4.1"
             print("✅ 使用OpenAI API", f"模型: {self.model}")
         
-        # 设置OpenAI客户端
-        if self.provider == "deepseek":
-            openai.api_key = self.api_key
-            openai.base_url = self.base_url
-        else:
-            openai.api_key = self.api_key
+        # 共享的长连接客户端（不修改全局 openai.api_key/base_url）
+        self.client = get_llm_client(self.provider, self.api_key, self.base_url)
         
         
         # 从YAML文件加载配置
@@ -84,6 +107,11 @@ class AIFundingFilter:
         
         # 标题去重相似度阈值
         self.similarity_threshold = 0.7
+        
+        # 单篇文章筛选结果记忆（AI_VERDICT_FILE 为空时关闭；模拟LLM的结果不写入）
+        verdict_file = os.getenv('AI_VERDICT_FILE', default_verdict_path())
+        if verdict_file and self.provider != "fake":
+            self.verdict_store = ArticleVerdictStore(verdict_file)
 
     def _load_config(self):
         """从YAML文件加载配置"""
@@ -311,15 +339,9 @@ class AIFundingFilter:
             temperature = settings.get('temperature', 0)
             
             # 调用AI API
-            if self.provider == "deepseek":
-                client = openai.OpenAI(
-                    api_key=self.api_key,
-                    base_url=self.base_url
-                )
-            else:
-                client = openai.OpenAI(api_key=self.api_key)
+            client = self.client
                 
-            response = client.chat.completions.create(
+            response = chat_completion(client, self.provider,
                 model=self.model,
                 messages=[
                     {"role": "user", "content": prompt}
@@ -454,15 +476,9 @@ class AIFundingFilter:
         
         try:
             # 调用AI API
-            if self.provider == "deepseek":
-                client = openai.OpenAI(
-                    api_key=self.api_key,
-                    base_url=self.base_url
-                )
-            else:
-                client = openai.OpenAI(api_key=self.api_key)
+            client = self.client
                 
-            response = client.chat.completions.create(
+            response = chat_completion(client, self.provider,
                 model=self.model,
                 messages=[
                     {"role": "user", "content": prompt}
@@ -514,19 +530,13 @@ class AIFundingFilter:
         
         try:
             # 调用AI API
-            if self.provider == "deepseek":
-                client = openai.OpenAI(
-                    api_key=self.api_key,
-                    base_url=self.base_url
-                )
-            else:
-                client = openai.OpenAI(api_key=self.api_key)
+            client = self.client
                 
             settings = funding_config.get('settings', {})
             max_tokens = settings.get('max_tokens', 4000)
             temperature = settings.get('temperature', 0)
             
-            response = client.chat.completions.create(
+            response = chat_completion(client, self.provider,
                 model=self.model,
                 messages=[
                     {"role": "user", "content": prompt}
@@ -767,13 +777,8 @@ class AIFundingFilter:
         
         for i, article in enumerate(articles_batch):
             article_id = f"ID{i+1}"
-            title = article.get('title', '')
-            content = article.get('content_text', '')[:100]
             id_mapping[article_id] = i
-            if article_type in ["project", "blockchain", "middleware", "defi", "rwa", "stablecoin", "application", "gamefi", "exchange_wallet", "ai_crypto", "depin"]:
-                articles_text += f"\n{article_id}: {title}\n"
-            else:  # fund and others
-                articles_text += f"\n{article_id}: {title}  - {content} \n"
+            articles_text += self._format_batch_article(article_id, article, article_type)
         
         # 映射文章类型到中文类别名称
         type_to_category = {
@@ -799,20 +804,15 @@ class AIFundingFilter:
         
         try:
             # 根据提供商创建客户端
-            if self.provider == "deepseek":
-                client = openai.OpenAI(
-                    api_key=self.api_key,
-                    base_url=self.base_url
-                )
-            else:
-                client = openai.OpenAI(api_key=self.api_key)
+            client = self.client
                 
-            response = client.chat.completions.create(
+            response = chat_completion(client, self.provider,
                 model=self.model,
                 messages=[
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=200,
+                max_tokens=id_list_max_tokens(len(articles_batch)),
+                temperature=0
             )
             
             result = response.choices[0].message.content.strip()
@@ -847,26 +847,53 @@ class AIFundingFilter:
                 'success': False
             }
     
-    def batch_filter_no_prompt(self, articles, batch_size=20, max_articles=None, article_type="project"):
+    def _format_batch_article(self, article_id, article, article_type):
+        """批次prompt中单篇文章的文本"""
+        title = article.get('title', '')
+        if article_type in self.TITLE_ONLY_TYPES:
+            return f"\n{article_id}: {title}\n"
+        # fund and others
+        content = article.get('content_text', '')[:100]
+        return f"\n{article_id}: {title}  - {content} \n"
+    
+    def _make_batches(self, articles, batch_size, article_type, token_budget=None):
+        """划分批次：设置 token_budget 时按文章文本的估算token数装满每个批次，否则固定 batch_size 篇"""
+        if not token_budget:
+            return [articles[start:start + batch_size] for start in range(0, len(articles), batch_size)]
+        return pack_batches(
+            articles,
+            lambda article: self._format_batch_article("ID00", article, article_type),
+            token_budget,
+            max_items=MAX_BATCH_ARTICLES
+        )
+    
+    def batch_filter_no_prompt(self, articles, batch_size=20, max_articles=None, article_type="project",
+                               token_budget=None):
         """批量筛选文章 - 不需要用户确认的版本"""
         if max_articles:
             articles = articles[:max_articles]
         
         type_name = self.TYPE_NAME_MAPPING.get(article_type, article_type)
         print(f"开始使用OpenAI API批量筛选 {len(articles)} 篇{type_name}文章...")
-        print(f"📦 批处理大小: {batch_size} 篇/次")
+        if token_budget:
+            print(f"📦 批处理大小: 按 {token_budget} token/次 打包")
+        else:
+            print(f"📦 批处理大小: {batch_size} 篇/次")
+        
+        # 已有筛选结果的文章不再调用API
+        verdicts, pending = self._recall_verdicts(articles, article_type)
         
         # 计算预估成本
-        num_batches = (len(articles) + batch_size - 1) // batch_size
+        batches = self._make_batches(pending, batch_size, article_type, token_budget)
+        num_batches = len(batches)
         print(f"📊 预计API调用次数: {num_batches} 次")
         
         filtered_articles = []
         
         # 分批处理
-        for batch_start in range(0, len(articles), batch_size):
-            batch_end = min(batch_start + batch_size, len(articles))
-            batch_articles = articles[batch_start:batch_end]
-            batch_num = (batch_start // batch_size) + 1
+        batch_start = 0
+        for batch_num, batch_articles in enumerate(batches, 1):
+            batch_end = batch_start + len(batch_articles)
             
             # 计算并显示进度
             progress = int((batch_num / num_batches) * 100)
@@ -875,24 +902,132 @@ class AIFundingFilter:
             
             # 调用API批量筛选，传入文章类型
             filter_result = self.filter_batch_articles(batch_articles, article_type)
-            
-            if filter_result['success']:
-                selected_indices = filter_result['selected_indices']
-                print(f"  ✅ 选中 {len(selected_indices)} 篇: {selected_indices}")
-                
-                # 添加选中的文章
-                for idx in selected_indices:
-                    if 0 <= idx < len(batch_articles):
-                        filtered_articles.append(batch_articles[idx])
-                        
-            else:
-                print(f"  ⚠️ 批次处理失败，保留所有文章")
-                filtered_articles.extend(batch_articles)
-            time.sleep(1)
+            filtered_articles.extend(self._select_batch_articles(batch_articles, filter_result, article_type))
+            batch_start = batch_end
         
+        filtered_articles = self._merge_verdicts(articles, verdicts, filtered_articles)
         print(f"\n✅ {type_name}筛选完成: {len(articles)} → {len(filtered_articles)} 篇")
         return filtered_articles
     
+    def _select_batch_articles(self, batch_articles, filter_result, article_type=None):
+        """根据批次筛选结果返回选中的文章，批次失败时保留所有文章"""
+        if not filter_result['success']:
+            print(f"  ⚠️ 批次处理失败，保留所有文章")
+            return list(batch_articles)
+        
+        selected_indices = filter_result['selected_indices']
+        print(f"  ✅ 选中 {len(selected_indices)} 篇: {selected_indices}")
+        
+        # 记住本批次每篇文章的保留/抛弃结果（失败的批次不记录）
+        if self.verdict_store is not None and article_type is not None:
+            selected = set(selected_indices)
+            self.verdict_store.put_many(
+                article_type, self._criteria_version(article_type),
+                [(self._verdict_key(article), i in selected) for i, article in enumerate(batch_articles)]
+            )
+        
+        return [batch_articles[idx] for idx in selected_indices if 0 <= idx < len(batch_articles)]
+    
+    def _criteria_version(self, article_type):
+        """类别筛选标准的版本号：prompt模板、筛选标准、通用配置或模型变化时改变"""
+        prompts_config = self.prompts_config or {}
+        categories = prompts_config.get('categories', {})
+        category_name = self.TYPE_NAME_MAPPING.get(article_type, "项目融资")
+        relevant = {
+            'provider': self.provider,
+            'model': self.model,
+            'article_type': article_type,
+            'common': prompts_config.get('common'),
+            'category': categories.get(category_name, categories.get("项目融资"))
+        }
+        payload = json.dumps(relevant, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def _verdict_key(self, article):
+        """文章在筛选结果记忆中的键：文章ID，没有ID时使用标题哈希"""
+        article_id = article.get('id')
+        if article_id:
+            return article_id
+        return "title:" + hashlib.sha1(article.get('title', '').encode('utf-8')).hexdigest()
+    
+    def _recall_verdicts(self, articles, article_type):
+        """查询已有的筛选结果，返回 (已知结果 {键: 是否保留}, 待筛选文章)"""
+        if self.verdict_store is None or not articles:
+            return {}, articles
+        
+        verdicts = self.verdict_store.get_many(
+            article_type, self._criteria_version(article_type),
+            [self._verdict_key(article) for article in articles]
+        )
+        pending = [article for article in articles if self._verdict_key(article) not in verdicts]
+        if verdicts:
+            type_name = self.TYPE_NAME_MAPPING.get(article_type, article_type)
+            print(f"🧠 {type_name}: {len(articles) - len(pending)} 篇已有筛选结果，{len(pending)} 篇需要调用API")
+        return verdicts, pending
+    
+    def _merge_verdicts(self, articles, verdicts, filtered_pending):
+        """合并已知结果与本次筛选结果，按原文章顺序返回保留的文章"""
+        if self.verdict_store is None:
+            return filtered_pending
+        kept = {id(article) for article in filtered_pending}
+        return [article for article in articles
+                if verdicts.get(self._verdict_key(article), id(article) in kept)]
+    
+    def batch_filter_concurrent(self, articles_by_type, batch_size=20, max_articles=None, max_in_flight=4,
+                                token_budget=None):
+        """并发批量筛选多个类别的文章 - 不需要用户确认的版本
+        
+        articles_by_type: {article_type: 文章列表}。所有类别的批次进入同一个
+        线程池，同时进行的API请求不超过 max_in_flight 个。每个类别返回的文章
+        顺序与逐批调用 batch_filter_no_prompt 相同，失败的批次保留所有文章。
+        """
+        batches = []  # (article_type, 批次序号, 批次文章)
+        batch_results = {}
+        recalled = {}  # article_type -> (全部文章, 已知结果)
+        for article_type, articles in articles_by_type.items():
+            if max_articles:
+                articles = articles[:max_articles]
+            verdicts, pending = self._recall_verdicts(articles, article_type)
+            recalled[article_type] = (articles, verdicts)
+            type_batches = self._make_batches(pending, batch_size, article_type, token_budget)
+            batch_results[article_type] = [None] * len(type_batches)
+            batches.extend((article_type, index, batch) for index, batch in enumerate(type_batches))
+        
+        max_in_flight = max(1, min(max_in_flight, len(batches) or 1))
+        print(f"开始并发批量筛选 {len(articles_by_type)} 个类别，共 {len(batches)} 个批次")
+        batch_desc = f"按 {token_budget} token/次 打包" if token_budget else f"{batch_size} 篇/次"
+        print(f"📦 批处理大小: {batch_desc}，最大并发请求: {max_in_flight}")
+        
+        done = 0
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            futures = {
+                executor.submit(self.filter_batch_articles, batch, article_type): (article_type, index, batch)
+                for article_type, index, batch in batches
+            }
+            for future in as_completed(futures):
+                article_type, index, batch = futures[future]
+                try:
+                    filter_result = future.result()
+                except Exception as e:
+                    print(f"  ❌ API调用失败: {e}")
+                    filter_result = {'selected_indices': [], 'ai_response': f"API错误: {str(e)}", 'success': False}
+                
+                done += 1
+                type_name = self.TYPE_NAME_MAPPING.get(article_type, article_type)
+                print(f"\n📦 完成{type_name}批次 {index + 1}/{len(batch_results[article_type])} "
+                      f"({len(batch)} 篇文章) - 总进度: {done}/{len(batches)}")
+                batch_results[article_type][index] = self._select_batch_articles(batch, filter_result, article_type)
+        
+        filtered_by_type = {}
+        for article_type, results in batch_results.items():
+            articles, verdicts = recalled[article_type]
+            filtered_pending = [article for selected in results for article in selected]
+            filtered_by_type[article_type] = self._merge_verdicts(articles, verdicts, filtered_pending)
+            type_name = self.TYPE_NAME_MAPPING.get(article_type, article_type)
+            print(f"✅ {type_name}筛选完成: {len(articles)} → {len(filtered_by_type[article_type])} 篇")
+        
+        return filtered_by_type
+    
     def batch_filter(self, articles, batch_size=20, max_articles=None, article_type="project"):
         """批量筛选文章"""
         if max_articles:
@@ -959,11 +1094,6 @@ class AIFundingFilter:
                         filtered_articles.append(article_with_filter)
             else:
                 print(f"  ❌ 批次处理失败")
-            
-            # 避免API速率限制
-            if batch_num < num_batches:
-                print(f"  ⏳ 暂停1秒...")
-                time.sleep(1)
         
         print(f"\n🎯 {type_name}批量筛选完成！")
         print(f"原始文章: {len(articles)} 篇")
@@ -1,13 +1,15 @@
 """AI service abstraction for multiple providers"""
 
 import asyncio
-import time
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, Union
 from datetime import datetime
-import openai
 
 from ..models.article import Article
+from ..utils.config import get_settings
+from .batch_packer import pack_batches, id_list_max_tokens, MAX_BATCH_ARTICLES
+from .llm_clients import get_llm_client
+from .rate_limiter import chat_completion
 
 
 class AIService(ABC):
@@ -53,11 +55,9 @@ class AIService(ABC):
             return articles
         
         # Process in batches for better results
-        batch_size = 20
         filtered_results = []
         
-        for i in range(0, len(articles), batch_size):
-            batch = articles[i:i+batch_size]
+        for batch in self._make_batches(articles, self._format_importance_article):
             # Get important articles from this batch
             important_indices = self.filter_articles_by_importance(batch)
             # Add the important articles to results
@@ -67,6 +67,18 @@ class AIService(ABC):
         
         return filtered_results
     
+    def _make_batches(self, articles: List[Dict], render) -> List[List[Dict]]:
+        """Pack articles into batches filling the configured input-token budget"""
+        settings = get_settings()
+        if not settings.ai_batch_token_budget:
+            batch_size = settings.ai_batch_size
+            return [articles[i:i + batch_size] for i in range(0, len(articles), batch_size)]
+        return pack_batches(articles, render, settings.ai_batch_token_budget, max_items=MAX_BATCH_ARTICLES)
+    
+    def _format_importance_article(self, article: Dict) -> str:
+        """Prompt text of one article in an importance-filtering batch"""
+        return f"00. {article.get('title', '')}\n{article.get('content_text', '')[:150]}\n\n"
+    
     def generate_report(self, filtered_results: Dict[str, List[Dict]]) -> str:
         """Generate a formatted report from filtered articles"""
         report_lines = []
@@ -92,10 +104,12 @@ class AIService(ABC):
 class OpenAIService(AIService):
     """OpenAI GPT-based AI service"""
     
+    provider = "openai"
+    
     def __init__(self, api_key: str, model: str = "gpt-4.1"):
         self.api_key = api_key
         self.model = model
-        self.client = openai.OpenAI(api_key=api_key)
+        self.client = get_llm_client(self.provider, api_key)
         self.config = self._load_config()
         self.prompts_config = self.config.get('ai_filter', {})
     
@@ -126,11 +140,12 @@ class OpenAIService(AIService):
             return articles
         
         # Process in batches for better results
-        batch_size = 20
         filtered_results = []
         
-        for i in range(0, len(articles), batch_size):
-            batch = articles[i:i+batch_size]
+        def format_article(article: Dict) -> str:
+            return self._format_category_article("ID00", article, category)
+        
+        for batch in self._make_batches(articles, format_article):
             # Use category-specific filtering
             important_indices = self.filter_batch_with_category(batch, category)
             # Add the important articles to results
@@ -152,7 +167,7 @@ class OpenAIService(AIService):
             # Create classification prompt
             prompt = self._create_classification_prompt(articles_text, category)
             
-            response = self.client.chat.completions.create(
+            response = chat_completion(self.client, self.provider,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
@@ -183,26 +198,18 @@ class OpenAIService(AIService):
         
         for i, article in enumerate(articles_batch):
             article_id = f"ID{i+1}"
-            title = article.get('title', '')
-            content = article.get('content_text', '')[:100]
             id_mapping[article_id] = i
-            
-            # For most categories, only include title
-            # For fund category, include content preview
-            if category in ["基金融资"]:
-                articles_text += f"\n{article_id}: {title} - {content}\n"
-            else:
-                articles_text += f"\n{article_id}: {title}\n"
+            articles_text += self._format_category_article(article_id, article, category)
         
         # Generate category-specific prompt
         prompt = self._generate_category_prompt(category, len(articles_batch), articles_text)
         
         try:
-            response = self.client.chat.completions.create(
+            response = chat_completion(self.client, self.provider,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,  # Slightly higher temperature for more diverse selection
-                max_tokens=200
+                max_tokens=id_list_max_tokens(len(articles_batch))
             )
             
             result = response.choices[0].message.content.strip()
@@ -236,6 +243,16 @@ class OpenAIService(AIService):
             # Return at least target_count articles if filtering fails
             return list(range(min(target_count, len(articles_batch))))
     
+    def _format_category_article(self, article_id: str, article: Dict, category: str) -> str:
+        """Prompt text of one article in a category-filtering batch"""
+        title = article.get('title', '')
+        # For most categories, only include title
+        # For fund category, include content preview
+        if category in ["基金融资"]:
+            content = article.get('content_text', '')[:100]
+            return f"\n{article_id}: {title} - {content}\n"
+        return f"\n{article_id}: {title}\n"
+    
     def _generate_category_prompt(self, category: str, count: int, articles_text: str) -> str:
         """Generate category-specific prompt from config"""
         if not self.prompts_config:
@@ -348,11 +365,11 @@ class OpenAIService(AIService):
 {articles_text}
 """
             
-            response = self.client.chat.completions.create(
+            response = chat_completion(self.client, self.provider,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
-                max_tokens=200
+                max_tokens=id_list_max_tokens(len(articles))
             )
             
             result_text = response.choices[0].message.content.strip()
@@ -375,7 +392,7 @@ class OpenAIService(AIService):
 摘要：
 """
             
-            response = self.client.chat.completions.create(
+            response = chat_completion(self.client, self.provider,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.3,
@@ -411,7 +428,7 @@ class OpenAIService(AIService):
 JSON格式返回：
 """
             
-            response = self.client.chat.completions.create(
+            response = chat_completion(self.client, self.provider,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
@@ -445,10 +462,6 @@ JSON格式返回：
                 batch_result = []
             
             results.extend(batch_result)
-            
-            # Add delay between batches to avoid rate limiting
-            if i + batch_size < len(articles):
-                time.sleep(1)
         
         return results
     
@@ -490,14 +503,13 @@ JSON格式返回：
 class DeepSeekService(AIService):
     """DeepSeek AI service implementation"""
     
+    provider = "deepseek"
+    
     def __init__(self, api_key: str, base_url: str = "https://api.deepseek.com"):
         self.api_key = api_key
         self.base_url = base_url
         self.model = "deepseek-chat"
-        self.client = openai.OpenAI(
-            api_key=api_key,
-            base_url=base_url
-        )
+        self.client = get_llm_client(self.provider, api_key, base_url)
     
     def classify_articles(self, articles: List[Article], category: str) -> List[int]:
         """Classify articles using DeepSeek"""
@@ -509,7 +521,7 @@ class DeepSeekService(AIService):
             articles_text = self._prepare_articles_text(articles)
             prompt = self._create_classification_prompt(articles_text, category)
             
-            response = self.client.chat.completions.create(
+            response = chat_completion(self.client, self.provider,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
@@ -538,11 +550,11 @@ class DeepSeekService(AIService):
 {articles_text}
 """
             
-            response = self.client.chat.completions.create(
+            response = chat_completion(self.client, self.provider,
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.1,
-                max_tokens=200
+                max_tokens=id_list_max_tokens(len(articles))
             )
             
             result_text = response.choices[0].message.content.strip()
@@ -599,6 +611,15 @@ class DeepSeekService(AIService):
             return []
 
 
+class FakeLLMService(OpenAIService):
+    """OpenAI service backed by the deterministic local fake LLM (see fake_llm)"""
+    
+    provider = "fake"
+    
+    def __init__(self, api_key: str = "fake", model: str = "fake-llm"):
+        super().__init__(api_key or "fake", model)
+
+
 def create_ai_service(provider: str, api_key: str, **kwargs) -> AIService:
     """Factory function to create AI service"""
     if provider.lower() == "openai":
@@ -606,5 +627,7 @@ def create_ai_service(provider: str, api_key: str, **kwargs) -> AIService:
     elif provider.lower() == "deepseek":
         base_url = kwargs.get("base_url", "https://api.deepseek.com")
         return DeepSeekService(api_key, base_url)
+    elif provider.lower() == "fake":
+        return FakeLLMService(api_key, **kwargs)
     else:
         raise ValueError(f"Unsupported AI provider: {provider}")
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""Append-only, day-partitioned JSONL article store"""
+
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SegmentedArticleStore:
+    """Article store made of one JSONL segment per publish day (UTC)
+
+    New articles are only ever appended to the segment of their publish day,
+    so write cost scales with the number of new articles rather than with the
+    size of the rolling window. An in-memory id index (rebuilt from the
+    segments on open) gives O(1) duplicate checks. Segments older than the
+    retention window are dropped as whole files, and segments holding
+    superseded records are compacted on a background thread.
+    """
+
+    SEGMENT_SUFFIX = ".jsonl"
+
+    def __init__(self, root_dir: Path, retention_days: int = 7, compact_threshold: float = 0.3):
+        self.root_dir = Path(root_dir)
+        self.retention_days = retention_days
+        self.compact_threshold = compact_threshold
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+        # article id -> segment day holding its live record
+        self._index: Dict[str, str] = {}
+        # segment day -> total lines / superseded lines
+        self._line_counts: Dict[str, int] = {}
+        self._dead_counts: Dict[str, int] = {}
+
+        self._load_index()
+
+    @staticmethod
+    def day_of(published: int) -> str:
+        """Segment key (UTC date) for a publish timestamp"""
+        return datetime.fromtimestamp(published, timezone.utc).strftime('%Y-%m-%d')
+
+    def _segment_path(self, day: str) -> Path:
+        return self.root_dir / f"{day}{self.SEGMENT_SUFFIX}"
+
+    def _segment_days(self) -> List[str]:
+        return sorted(p.stem for p in self.root_dir.glob(f"*{self.SEGMENT_SUFFIX}"))
+
+    def _read_segment(self, day: str) -> List[Dict[str, Any]]:
+        """Read all records of a segment, skipping torn or corrupt lines"""
+        path = self._segment_path(day)
+        records = []
+        if not path.exists():
+            return records
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    logger.warning(f"Skipping corrupt line in segment {path.name}")
+        return records
+
+    def _load_index(self):
+        """Rebuild the id index from the segments on disk"""
+        with self._lock:
+            self._index.clear()
+            self._line_counts.clear()
+            self._dead_counts.clear()
+
+            for day in self._segment_days():
+                records = self._read_segment(day)
+                self._line_counts[day] = len(records)
+                self._dead_counts[day] = 0
+                for record in records:
+                    article_id = record.get('id', '')
+                    previous_day = self._index.get(article_id)
+                    if previous_day is not None:
+                        self._dead_counts[previous_day] += 1
+                    self._index[article_id] = day
+
+    def __contains__(self, article_id: str) -> bool:
+        return article_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def append(self, articles: Iterable[Dict[str, Any]], replace: bool = False) -> int:
+        """Append articles whose id is not stored yet; returns the number written
+
+        With ``replace`` set, known ids are appended again and the newer line
+        supersedes the old one (reclaimed by compaction). Articles without a
+        publish timestamp can never enter the window and are ignored.
+        """
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+
+        with self._lock:
+            pending = set()
+            for article in articles:
+                article_id = article.get('id', '')
+                published = article.get('published', 0)
+                if not published or article_id in pending:
+                    continue
+                if article_id in self._index and not replace:
+                    continue
+                pending.add(article_id)
+                by_day.setdefault(self.day_of(published), []).append(article)
+
+            written = 0
+            for day, day_articles in by_day.items():
+                with open(self._segment_path(day), 'a', encoding='utf-8') as f:
+                    for article in day_articles:
+                        f.write(json.dumps(article, ensure_ascii=False) + '\n')
+
+                self._line_counts[day] = self._line_counts.get(day, 0) + len(day_articles)
+                self._dead_counts.setdefault(day, 0)
+                for article in day_articles:
+                    previous_day = self._index.get(article['id'])
+                    if previous_day is not None:
+                        self._dead_counts[previous_day] += 1
+                    self._index[article['id']] = day
+                written += len(day_articles)
+
+            return written
+
+    def expire(self, now: Optional[datetime] = None) -> int:
+        """Drop segments entirely outside the retention window; returns segments removed"""
+        now = now or datetime.now(timezone.utc)
+        cutoff_day = (now - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+
+        removed = 0
+        with self._lock:
+            for day in self._segment_days():
+                if day >= cutoff_day:
+                    continue
+                self._segment_path(day).unlink()
+                self._line_counts.pop(day, None)
+                self._dead_counts.pop(day, None)
+                removed += 1
+
+            if removed:
+                self._index = {aid: day for aid, day in self._index.items() if day >= cutoff_day}
+
+        return removed
+
+    def clear(self):
+        """Remove every segment"""
+        with self._lock:
+            shutil.rmtree(self.root_dir, ignore_errors=True)
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+            self._index.clear()
+            self._line_counts.clear()
+            self._dead_counts.clear()
+
+    def load_window(self, cutoff_ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Return live articles published at or after ``cutoff_ts``, newest first"""
+        if cutoff_ts is None:
+            cutoff_ts = (datetime.now(timezone.utc) - timedelta(days=self.retention_days)).timestamp()
+
+        articles = []
+        with self._lock:
+            for day in self._segment_days():
+                latest: Dict[str, Dict[str, Any]] = {}
+                for record in self._read_segment(day):
+                    latest[record.get('id', '')] = record
+                for article_id, record in latest.items():
+                    if self._index.get(article_id) == day and record.get('published', 0) >= cutoff_ts:
+                        articles.append(record)
+
+        articles.sort(key=lambda x: x.get('published', 0), reverse=True)
+        return articles
+
+    def compact(self, day: str) -> int:
+        """Rewrite a segment with only its live records; returns lines reclaimed"""
+        with self._lock:
+            records = self._read_segment(day)
+            latest: Dict[str, Dict[str, Any]] = {}
+            for record in records:
+                latest[record.get('id', '')] = record
+            live = [r for aid, r in latest.items() if self._index.get(aid) == day]
+            live.sort(key=lambda x: x.get('published', 0), reverse=True)
+
+            path = self._segment_path(day)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in live:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, path)
+
+            self._line_counts[day] = len(live)
+            self._dead_counts[day] = 0
+            return len(records) - len(live)
+
+    def segments_needing_compaction(self) -> List[str]:
+        """Segments whose share of superseded lines exceeds the threshold"""
+        with self._lock:
+            return [
+                day for day, total in self._line_counts.items()
+                if total and self._dead_counts.get(day, 0) / total > self.compact_threshold
+            ]
+
+    def compact_in_background(self) -> Optional[threading.Thread]:
+        """Compact fragmented segments on a daemon thread (no-op if one is running)"""
+        days = self.segments_needing_compaction()
+        if not days:
+            return None
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return self._compaction_thread
+
+        def run():
+            for day in days:
+                try:
+                    reclaimed = self.compact(day)
+                    logger.info(f"Compacted segment {day}: reclaimed {reclaimed} lines")
+                except Exception as e:
+                    logger.warning(f"Failed to compact segment {day}: {e}")
+
+        self._compaction_thread = threading.Thread(target=run, daemon=True)
+        self._compaction_thread.start()
+        return self._compaction_thread
+
+    def export_legacy(self, path: Path, metadata: Dict[str, Any],
+                      articles: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Write the window as a legacy ``latest_feeds.json`` style document"""
+        if articles is None:
+            articles = self.load_window()
+        data = {'metadata': metadata, 'articles': articles}
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        return data
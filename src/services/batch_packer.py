@@ -0,0 +1,47 @@
+"""Token-aware packing of articles into LLM prompt batches"""
+
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+from .rate_limiter import estimate_tokens
+
+T = TypeVar('T')
+
+# Upper bound on articles per token-packed filtering request
+MAX_BATCH_ARTICLES = 50
+
+# Output tokens reserved for an ID-list answer: fixed slack plus per article,
+# never below the fixed limit used before batches were packed by tokens
+ID_LIST_BASE_TOKENS = 64
+ID_LIST_TOKENS_PER_ARTICLE = 5
+ID_LIST_MIN_TOKENS = 200
+
+
+def pack_batches(items: Sequence[T], render: Callable[[T], str], token_budget: int,
+                 max_items: Optional[int] = None) -> List[List[T]]:
+    """Split ``items`` into consecutive batches whose rendered text fits ``token_budget``
+
+    Order is preserved and every batch holds at least one item, so an item
+    larger than the budget gets a batch of its own. ``max_items`` caps the
+    batch length regardless of the budget.
+    """
+    batches: List[List[T]] = []
+    current: List[T] = []
+    current_tokens = 0
+
+    for item in items:
+        tokens = estimate_tokens(render(item))
+        if current and (current_tokens + tokens > token_budget
+                        or (max_items is not None and len(current) >= max_items)):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def id_list_max_tokens(count: int) -> int:
+    """``max_tokens`` for an answer listing up to ``count`` article IDs"""
+    return max(ID_LIST_MIN_TOKENS, ID_LIST_BASE_TOKENS + ID_LIST_TOKENS_PER_ARTICLE * count)
@@ -0,0 +1,145 @@
+"""Persistent classification cache keyed by article content and config version"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Any, Iterable, Tuple
+
+
+# Bump when classifier logic changes in a way the config hash cannot see
+CLASSIFIER_VERSION = 1
+
+# Articles leave the rolling fetch window long before this
+DEFAULT_TTL_DAYS = 14
+DEFAULT_MAX_ENTRIES = 100000
+# Evict at most once per this many put_many calls
+EVICTION_INTERVAL = 20
+DEFAULT_CACHE_FILE = 'classification_cache.db'
+
+
+def default_cache_path() -> str:
+    """Cache database under the ``cache`` directory of DATA_DIR"""
+    return os.path.join(os.getenv('DATA_DIR', '.'), 'cache', DEFAULT_CACHE_FILE)
+
+
+def article_content_hash(article: Dict[str, Any]) -> str:
+    """Hash of the fields the classifier reads (title and content text)"""
+    content = f"{article.get('title', '')}\0{article.get('content_text', '')}"
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def classification_config_hash(config: Dict[str, Any]) -> str:
+    """Hash of the config sections that affect classification output"""
+    relevant = {
+        'classifier_version': CLASSIFIER_VERSION,
+        'classification': config.get('classification', {}),
+        'portfolio_projects': config.get('portfolio_projects', [])
+    }
+    payload = json.dumps(relevant, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ClassificationCache:
+    """SQLite-backed store of classifier results
+
+    Entries are keyed by (config hash, article content hash), so editing the
+    ``classification`` or ``portfolio_projects`` sections of
+    ``crypto_config.yaml`` changes the config hash and every old entry stops
+    matching. Entries of other config versions are purged on open; entries
+    older than ``ttl_days`` and the oldest ones beyond ``max_entries`` are
+    evicted on open and periodically while writing.
+    """
+
+    def __init__(self, db_path: str, config: Dict[str, Any], ttl_days: float = DEFAULT_TTL_DAYS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.config_hash = classification_config_hash(config)
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._init_database()
+
+    def _init_database(self):
+        """Create the cache table and drop stale entries and those of other config versions"""
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS classification_cache (
+                    config_hash TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (config_hash, content_hash)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_classification_created ON classification_cache(created_at)")
+            conn.execute("DELETE FROM classification_cache WHERE config_hash != ?", (self.config_hash,))
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop expired entries, then the oldest ones beyond ``max_entries``"""
+        conn.execute("DELETE FROM classification_cache WHERE created_at < datetime('now', ?)",
+                     (f'-{self.ttl_days} days',))
+        conn.execute("""
+            DELETE FROM classification_cache WHERE rowid IN (
+                SELECT rowid FROM classification_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def get_many(self, content_hashes: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up cached classifications; returns {content_hash: classification}"""
+        content_hashes = list(dict.fromkeys(content_hashes))
+        found = {}
+
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(content_hashes), 500):
+                chunk = content_hashes[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT content_hash, result FROM classification_cache "
+                    f"WHERE config_hash = ? AND content_hash IN ({placeholders})",
+                    [self.config_hash] + chunk
+                ).fetchall()
+                for content_hash, result in rows:
+                    found[content_hash] = json.loads(result)
+
+            self.hits += len(found)
+            self.misses += len(content_hashes) - len(found)
+
+        return found
+
+    def put_many(self, items: List[Tuple[str, Dict[str, Any]]]):
+        """Store (content_hash, classification) pairs"""
+        if not items:
+            return
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO classification_cache (config_hash, content_hash, result) "
+                "VALUES (?, ?, ?)",
+                [(self.config_hash, content_hash, json.dumps(classification, ensure_ascii=False))
+                 for content_hash, classification in items]
+            )
+            self._writes += 1
+            if self._writes % EVICTION_INTERVAL == 0:
+                self._evict(conn)
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM classification_cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this instance"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total * 100) if total else 0.0,
+            'config_hash': self.config_hash[:12]
+        }
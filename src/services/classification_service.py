@@ -1,21 +1,166 @@
 """Article classification service"""
 
 import json
+import os
 import re
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Tuple
 import yaml
 
+from ..utils.keyword_matcher import KeywordMatcher, get_phrase_matcher
+from .classification_cache import (
+    ClassificationCache, article_content_hash, default_cache_path, DEFAULT_TTL_DAYS, DEFAULT_MAX_ENTRIES
+)
+
+# Optional dependencies for the vectorized batch classification path
+try:
+    import numpy as np
+    from scipy import sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+class CategoryMatcher:
+    """Compiled matcher for the keywords and patterns of all scored categories
+    
+    All category keywords share one Aho-Corasick automaton, so an article is
+    scanned once for every keyword; patterns are compiled once. Scores are
+    identical to ``ClassificationService.calculate_score`` per category.
+    """
+    
+    # Categories that are never scored by keywords
+    SKIPPED_CATEGORIES = ("其他", "portfolios")
+    
+    def __init__(self, categories: Dict[str, Any]):
+        self.categories = []
+        for category, config in categories.items():
+            if category in self.SKIPPED_CATEGORIES:
+                continue
+            keywords = [keyword.lower() for keyword in config.get('keywords', [])]
+            patterns = [re.compile(pattern, re.IGNORECASE) for pattern in config.get('patterns', [])]
+            self.categories.append((category, keywords, patterns, config.get('weight', 1.0)))
+        
+        self.keyword_matcher = KeywordMatcher(
+            keyword for _, keywords, _, _ in self.categories for keyword in keywords
+        )
+        
+        # Term vocabulary for the batch path: every keyword, then every pattern
+        self.vocabulary = list(self.keyword_matcher.keywords)
+        self._keyword_columns = {keyword: i for i, keyword in enumerate(self.vocabulary)}
+        self._pattern_columns = {}
+        for _, _, patterns, _ in self.categories:
+            for pattern in patterns:
+                key = (pattern.pattern, pattern.flags)
+                if key not in self._pattern_columns:
+                    self._pattern_columns[key] = (len(self.vocabulary), pattern)
+                    self.vocabulary.append(pattern.pattern)
+    
+    @property
+    def category_names(self) -> List[str]:
+        return [category for category, _, _, _ in self.categories]
+    
+    @property
+    def category_weights(self) -> List[float]:
+        return [weight for _, _, _, weight in self.categories]
+    
+    def term_counts(self, text: str) -> Dict[int, int]:
+        """Non-zero term counts of preprocessed text, keyed by vocabulary column"""
+        counts = {}
+        for keyword, (bounded, plain) in self.keyword_matcher.count(text).items():
+            counts[self._keyword_columns[keyword]] = bounded if bounded else plain
+        for column, pattern in self._pattern_columns.values():
+            matches = sum(1 for _ in pattern.finditer(text))
+            if matches:
+                counts[column] = matches
+        return counts
+    
+    def hit_matrix(self):
+        """Sparse (vocabulary x category) matrix of integer hit multipliers
+        
+        A keyword contributes 1 per listing in a category and a pattern 2, so
+        ``term_counts @ hit_matrix`` equals ``hit_counts`` for every category.
+        """
+        rows, cols, data = [], [], []
+        for category_index, (_, keywords, patterns, _) in enumerate(self.categories):
+            for keyword in keywords:
+                rows.append(self._keyword_columns[keyword])
+                cols.append(category_index)
+                data.append(1)
+            for pattern in patterns:
+                rows.append(self._pattern_columns[(pattern.pattern, pattern.flags)][0])
+                cols.append(category_index)
+                data.append(2)
+        # Duplicate (row, col) entries are summed on conversion
+        return sparse.csr_matrix(
+            (np.array(data, dtype=np.int64), (rows, cols)),
+            shape=(len(self.vocabulary), len(self.categories))
+        )
+    
+    def hit_counts(self, text: str) -> Dict[str, int]:
+        """Unweighted hit count per category for already preprocessed text"""
+        keyword_counts = self.keyword_matcher.count(text)
+        hits = {}
+        
+        for category, keywords, patterns, _ in self.categories:
+            score = 0
+            for keyword in keywords:
+                bounded, plain = keyword_counts.get(keyword, (0, 0))
+                # Word-boundary matches first, plain substring for Chinese keywords
+                score += bounded if bounded else plain
+            for pattern in patterns:
+                score += sum(1 for _ in pattern.finditer(text)) * 2  # Pattern matches get 2x weight
+            hits[category] = score
+        
+        return hits
+    
+    def score(self, text: str) -> Dict[str, float]:
+        """Weighted score per category for already preprocessed text"""
+        hits = self.hit_counts(text)
+        return {category: hits[category] * weight for category, _, _, weight in self.categories}
+
+
+# Per-process classifier used by the process-pool classification workers
+_worker_classifier = None
+
+
+def _init_classification_worker(config: Dict[str, Any]):
+    """Compile the classification config once in each worker process"""
+    global _worker_classifier
+    _worker_classifier = ClassificationService(config=config, cache_file="")
+
+
+def _classify_shard(shard: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Classify one shard of articles in a worker process"""
+    return [_worker_classifier.classify_article(article) for article in shard]
+
+
 class ClassificationService:
     """Service for classifying crypto news articles"""
     
-    def __init__(self):
-        self.config = self._load_config()
+    # Minimum shard size for process-pool classification
+    MIN_SHARD_SIZE = 200
+    
+    def __init__(self, config: Dict[str, Any] = None, cache_file: str = None):
+        self.config = config if config is not None else self._load_config()
         self.portfolios = self.config.get('portfolio_projects', [])
         self.categories = self.config.get('classification', {}).get('categories', {})
         self.title_exclusion_keywords = self.config.get('content_filters', {}).get('title_exclusion_keywords', [])
+        self.category_matcher = CategoryMatcher(self.categories)
+        self.portfolio_matcher = get_phrase_matcher(self.portfolios)
+        self.exclusion_matcher = get_phrase_matcher(self.title_exclusion_keywords)
+        
+        # Persistent result cache; disabled with cache_file=""
+        if cache_file is None:
+            cache_file = os.getenv('CLASSIFICATION_CACHE_FILE', default_cache_path())
+        self.cache = ClassificationCache(
+            cache_file, self.config,
+            ttl_days=float(os.getenv('CLASSIFICATION_CACHE_TTL_DAYS', str(DEFAULT_TTL_DAYS))),
+            max_entries=int(os.getenv('CLASSIFICATION_CACHE_MAX_ENTRIES', str(DEFAULT_MAX_ENTRIES)))
+        ) if cache_file else None
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file"""
@@ -70,12 +215,7 @@ class ClassificationService:
         """Check if article mentions IOSG portfolio projects"""
         title = article.get('title', '')
         text = self.preprocess_text(title.lower())
-        mentioned_projects = []
-        
-        for project in self.portfolios:
-            pattern = r'\b' + re.escape(project.lower()) + r'\b'
-            if re.search(pattern, text):
-                mentioned_projects.append(project)
+        mentioned_projects = self.portfolio_matcher.find_words(text)
         
         portfolio = len(mentioned_projects) > 0
         
@@ -92,8 +232,6 @@ class ClassificationService:
         content = article.get('content_text', '')
         combined_text = f"{title} {content}"
         
-        scores = {}
-        
         # Check portfolio keywords
         portfolio_info = self.check_portfolio_mention(article)
         
@@ -108,16 +246,8 @@ class ClassificationService:
                 'mention_count': portfolio_info['mention_count']
             }
         
-        # Calculate scores for each category (excluding portfolios and 其他)
-        for category, config in self.categories.items():
-            if category in ["其他", "portfolios"]:
-                continue  # Skip fallback category and portfolios
-            
-            keywords = config['keywords']
-            patterns = config.get('patterns', [])
-            weight = config['weight']
-            score = self.calculate_score(combined_text, keywords, patterns) * weight
-            scores[category] = score
+        # Calculate scores for each category (excluding portfolios and 其他) in one pass
+        scores = self.category_matcher.score(self.preprocess_text(combined_text))
         
         # Find the highest scoring category
         if scores and max(scores.values()) > 0:
@@ -136,9 +266,101 @@ class ClassificationService:
             'mention_count': portfolio_info['mention_count']
         }
     
+    def _apply_classification(self, article: Dict[str, Any], classification: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy an article and attach its classification fields"""
+        article_with_class = article.copy()
+        article_with_class.update({
+            'classification': classification['category'],
+            'classification_confidence': classification['confidence'],
+            'classification_scores': classification['scores'],
+            'portfolio': classification['portfolio'],
+            'mentioned_projects': classification['mentioned_projects'],
+            'mention_count': classification['mention_count']
+        })
+        return article_with_class
+    
     def classify_articles(self, articles: List[Dict[str, Any]], 
-                         progress_callback=None, log_callback=None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
-        """Classify all articles"""
+                         progress_callback=None, log_callback=None,
+                         vectorized: bool = False,
+                         processes: int = None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Classify all articles
+        
+        ``vectorized`` switches to the sparse-matrix batch path, which yields
+        the same labels and scores; it needs numpy and scipy and falls back
+        to the per-article loop without them. ``processes`` > 1 shards the
+        articles across a process pool instead (0 means one per CPU).
+        
+        With the classification cache enabled, articles whose title and
+        content were classified before under the same config are served from
+        the cache and only the rest go through one of the paths above.
+        """
+        if self.cache is not None:
+            return self._classify_articles_cached(articles, progress_callback, log_callback,
+                                                  vectorized, processes)
+        return self._classify_uncached(articles, progress_callback, log_callback, vectorized, processes)
+    
+    def _classify_articles_cached(self, articles: List[Dict[str, Any]],
+                                  progress_callback=None, log_callback=None,
+                                  vectorized: bool = False,
+                                  processes: int = None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Serve cached classifications and classify only the misses"""
+        content_hashes = [article_content_hash(article) for article in articles]
+        cached = self.cache.get_many(content_hashes)
+        
+        misses = [article for article, content_hash in zip(articles, content_hashes)
+                  if content_hash not in cached]
+        if log_callback:
+            log_callback(f"分类缓存命中 {len(articles) - len(misses)}/{len(articles)} 篇，"
+                         f"需分类 {len(misses)} 篇")
+        
+        classified_misses = []
+        if misses:
+            classified_misses, _ = self._classify_uncached(misses, progress_callback, log_callback,
+                                                           vectorized, processes)
+        
+        new_entries = []
+        for article in classified_misses:
+            content_hash = article_content_hash(article)
+            if content_hash not in cached:
+                cached[content_hash] = {
+                    'category': article['classification'],
+                    'confidence': article['classification_confidence'],
+                    'scores': article['classification_scores'],
+                    'portfolio': article['portfolio'],
+                    'mentioned_projects': article['mentioned_projects'],
+                    'mention_count': article['mention_count']
+                }
+                new_entries.append((content_hash, cached[content_hash]))
+        self.cache.put_many(new_entries)
+        
+        classified_articles = []
+        category_stats = defaultdict(int)
+        for article, content_hash in zip(articles, content_hashes):
+            classification = cached[content_hash]
+            # Duplicate contents share a cache entry; keep per-article copies
+            classification = dict(classification, scores=dict(classification['scores']),
+                                  mentioned_projects=list(classification['mentioned_projects']))
+            classified_articles.append(self._apply_classification(article, classification))
+            category_stats[classification['category']] += 1
+        
+        return classified_articles, dict(category_stats)
+    
+    def _classify_uncached(self, articles: List[Dict[str, Any]],
+                           progress_callback=None, log_callback=None,
+                           vectorized: bool = False,
+                           processes: int = None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Classify articles through the loop, vectorized or process-pool path"""
+        if processes is not None and processes != 1:
+            processes = processes or os.cpu_count() or 1
+            if processes > 1 and len(articles) >= 2 * self.MIN_SHARD_SIZE:
+                return self._classify_articles_parallel(articles, processes, progress_callback, log_callback)
+        
+        if vectorized:
+            if SCIPY_AVAILABLE:
+                return self._classify_articles_vectorized(articles, progress_callback, log_callback)
+            if log_callback:
+                log_callback("numpy/scipy 不可用，使用逐篇分类")
+        
         classified_articles = []
         category_stats = defaultdict(int)
         
@@ -156,17 +378,117 @@ class ClassificationService:
             classification = self.classify_article(article)
             
             # Add classification info to article
-            article_with_class = article.copy()
-            article_with_class.update({
-                'classification': classification['category'],
-                'classification_confidence': classification['confidence'],
-                'classification_scores': classification['scores'],
-                'portfolio': classification['portfolio'],
-                'mentioned_projects': classification['mentioned_projects'],
-                'mention_count': classification['mention_count']
-            })
+            classified_articles.append(self._apply_classification(article, classification))
+            category_stats[classification['category']] += 1
+        
+        return classified_articles, dict(category_stats)
+    
+    def _classify_articles_parallel(self, articles: List[Dict[str, Any]], processes: int,
+                                    progress_callback=None, log_callback=None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Shard articles across a process pool and merge results in original order"""
+        total = len(articles)
+        shard_size = max(self.MIN_SHARD_SIZE, -(-total // (processes * 4)))
+        shards = [articles[start:start + shard_size] for start in range(0, total, shard_size)]
+        processes = min(processes, len(shards))
+        
+        if log_callback:
+            log_callback(f"开始并行分类 {total} 篇文章（{processes} 个进程，{len(shards)} 个分片）...")
+        
+        shard_results: List[List[Dict[str, Any]]] = [None] * len(shards)
+        done = 0
+        with ProcessPoolExecutor(max_workers=processes,
+                                 initializer=_init_classification_worker,
+                                 initargs=(self.config,)) as executor:
+            futures = {executor.submit(_classify_shard, shard): index for index, shard in enumerate(shards)}
+            for future in as_completed(futures):
+                index = futures[future]
+                shard_results[index] = future.result()
+                done += len(shards[index])
+                if log_callback:
+                    log_callback(f"已处理 {done}/{total} 篇文章")
+                if progress_callback:
+                    progress_callback(int(done / total * 100), f"Processing {done}/{total}")
+        
+        classified_articles = []
+        category_stats = defaultdict(int)
+        for shard, classifications in zip(shards, shard_results):
+            for article, classification in zip(shard, classifications):
+                classified_articles.append(self._apply_classification(article, classification))
+                category_stats[classification['category']] += 1
+        
+        return classified_articles, dict(category_stats)
+    
+    def _classify_articles_vectorized(self, articles: List[Dict[str, Any]],
+                                      progress_callback=None, log_callback=None) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Batch classification via a sparse (article x term) count matrix
+        
+        Hits per category are ``counts @ hit_matrix``; scores, the
+        portfolio-first rule and the 其他 fallback match ``classify_article``.
+        """
+        matcher = self.category_matcher
+        category_names = matcher.category_names
+        total = len(articles)
+        
+        if log_callback:
+            log_callback(f"开始批量向量化分类 {total} 篇文章...")
+        
+        # Build the term-count matrix; portfolio articles skip keyword scoring
+        portfolio_infos = []
+        rows, cols, data = [], [], []
+        for i, article in enumerate(articles):
+            portfolio_info = self.check_portfolio_mention(article)
+            portfolio_infos.append(portfolio_info)
+            if not portfolio_info['portfolio']:
+                text = self.preprocess_text(f"{article.get('title', '')} {article.get('content_text', '')}")
+                for column, count in matcher.term_counts(text).items():
+                    rows.append(i)
+                    cols.append(column)
+                    data.append(count)
+            
+            if (i + 1) % 100 == 0:
+                if log_callback:
+                    log_callback(f"已处理 {i + 1}/{total} 篇文章")
+                if progress_callback:
+                    progress_callback(int((i + 1) / total * 90), f"Processing {i + 1}/{total}")
+        
+        counts = sparse.csr_matrix(
+            (np.array(data, dtype=np.int64), (rows, cols)),
+            shape=(total, len(matcher.vocabulary))
+        )
+        hits = np.asarray((counts @ matcher.hit_matrix()).todense(), dtype=np.int64)
+        best_indexes = np.argmax(hits * np.array(matcher.category_weights), axis=1) if category_names else []
+        
+        classified_articles = []
+        category_stats = defaultdict(int)
+        for i, article in enumerate(articles):
+            portfolio_info = portfolio_infos[i]
+            if portfolio_info['portfolio']:
+                classification = {
+                    'category': 'portfolios',
+                    'confidence': portfolio_info['mention_count'],
+                    'scores': {'portfolios': portfolio_info['mention_count']},
+                    **portfolio_info
+                }
+            else:
+                # Same int * weight arithmetic as the per-article path
+                scores = {
+                    category: int(hits[i, j]) * weight
+                    for j, (category, weight) in enumerate(zip(category_names, matcher.category_weights))
+                }
+                best_category = category_names[best_indexes[i]] if scores else None
+                if best_category is not None and scores[best_category] > 0:
+                    confidence = scores[best_category]
+                else:
+                    best_category = "其他"
+                    confidence = 0
+                classification = {
+                    'category': best_category,
+                    'confidence': confidence,
+                    'scores': scores,
+                    **portfolio_info
+                }
             
-            classified_articles.append(article_with_class)
+            classified_articles.append(self._apply_classification(article, classification))
             category_stats[classification['category']] += 1
         
         return classified_articles, dict(category_stats)
@@ -190,13 +512,7 @@ class ClassificationService:
             combined_text = f"{title} {content}"
             
             # Check if any exclusion keyword is present
-            should_exclude = False
-            for keyword in self.title_exclusion_keywords:
-                if keyword.lower() in combined_text:
-                    should_exclude = True
-                    break
-            
-            if not should_exclude:
+            if not self.exclusion_matcher.contains_any(combined_text):
                 filtered_articles.append(article)
         
         if log_callback:
@@ -206,7 +522,48 @@ class ClassificationService:
         
         return filtered_articles
     
-    def run_classification(self, progress_callback=None, log_callback=None) -> Dict[str, Any]:
+    def reclassify_file(self, filename: str = "historical_classified.json",
+                        processes: int = 0, progress_callback=None, log_callback=None) -> Dict[str, Any]:
+        """Re-classify every article of a classified file in place (e.g. after a config change)
+        
+        Unlike ``run_classification`` no exclusion filtering is applied, so
+        labelled historical articles are all kept.
+        """
+        input_file = Path(filename)
+        with open(input_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        articles = data.get('all_articles', data.get('articles', []))
+        classified_articles, category_stats = self.classify_articles(
+            articles, progress_callback, log_callback, processes=processes
+        )
+        
+        articles_by_category = defaultdict(list)
+        for article in classified_articles:
+            articles_by_category[article.get('classification', '其他')].append(article)
+        
+        metadata = data.get('metadata', {})
+        metadata.update({
+            'generated_at': datetime.now().isoformat(),
+            'total_articles': len(classified_articles),
+            'category_stats': category_stats
+        })
+        output_data = {
+            'metadata': metadata,
+            'categories': dict(articles_by_category),
+            'all_articles': classified_articles
+        }
+        
+        with open(input_file, 'w', encoding='utf-8') as f:
+            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        
+        if log_callback:
+            log_callback(f"重新分类完成: {input_file}（{len(classified_articles)} 篇）")
+        
+        return output_data
+    
+    def run_classification(self, progress_callback=None, log_callback=None,
+                           vectorized: bool = False, processes: int = None) -> Dict[str, Any]:
         """Run the complete classification process"""
         # Load latest feeds
         input_file = Path("latest_feeds.json")
@@ -233,7 +590,8 @@ class ClassificationService:
         
         # Classify articles
         classified_articles, category_stats = self.classify_articles(
-            filtered_articles, progress_callback, log_callback
+            filtered_articles, progress_callback, log_callback,
+            vectorized=vectorized, processes=processes
         )
         
         # Organize by category
@@ -13,6 +13,7 @@ from flask_mail import Mail, Message
 from pathlib import Path
 
 from ..models.report import Report
+from ..utils.keyword_matcher import get_phrase_matcher
 
 
 class EmailService:
@@ -463,17 +464,13 @@ IOSG Team
             # Only highlight keywords in Our portfolio section
             portfolio_section_pattern = r'(<h2[^>]*>Our portfolio</h2>.*?)(?=<h[12][^>]*>|$)'
             
+            portfolio_matcher = get_phrase_matcher(portfolio_projects)
+            
             def highlight_portfolio_section(match):
-                section_content = match.group(1)
-                
-                # Highlight each portfolio project name
-                for project in portfolio_projects:
-                    # Use word boundary to avoid partial matches
-                    pattern = r'\b' + re.escape(project) + r'\b'
-                    replacement = f'<span style="color: #e74c3c; font-weight: bold;">{project}</span>'
-                    section_content = re.sub(pattern, replacement, section_content, flags=re.IGNORECASE)
-                
-                return section_content
+                # Highlight all portfolio project names (whole words) in one pass
+                return portfolio_matcher.highlight(
+                    match.group(1), '<span style="color: #e74c3c; font-weight: bold;">{}</span>'
+                )
             
             # Apply highlighting only to Our portfolio section
             highlighted_html = re.sub(
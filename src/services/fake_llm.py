@@ -0,0 +1,209 @@
+"""Deterministic local stand-in for an OpenAI-compatible chat completions API
+
+Selected with provider ``"fake"`` (``create_ai_service("fake", ...)``,
+``AIFundingFilter(provider="fake")``, ``AdaptiveDeduplicationService(ai_provider="fake")``).
+Answers are derived from the prompt alone, so they are identical across runs
+and parse like real answers: ID lists for filtering, keep lists and duplicate
+groups for deduplication, funding JSON and summaries for reports. Latency and
+failures are simulated from a seeded random generator.
+
+Configured from the environment:
+    FAKE_LLM_LATENCY_MS      median latency per request (default 0)
+    FAKE_LLM_LATENCY_DIST    fixed | uniform | lognormal (default lognormal)
+    FAKE_LLM_LATENCY_SPREAD  uniform: +/- fraction; lognormal: sigma (default 0.5)
+    FAKE_LLM_MS_PER_TOKEN    extra latency per completion token (default 0)
+    FAKE_LLM_ERROR_RATE      share of requests failing with HTTP 500 (default 0)
+    FAKE_LLM_RATE_LIMIT_RATE share of requests failing with HTTP 429 (default 0)
+    FAKE_LLM_KEEP_RATIO      share of articles an ID-list answer keeps (default 0.5)
+    FAKE_LLM_SEED            seed of the latency/failure generator (default 0)
+"""
+
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from .rate_limiter import estimate_tokens
+
+
+_ID_LINE_RE = re.compile(r'^\s*(ID\d+):\s*(.*?)\s*$', re.MULTILINE)
+_NUMBERED_LINE_RE = re.compile(r'^\s*(\d+)\.\s*(.*?)\s*$', re.MULTILINE)
+_INDEXED_LINE_RE = re.compile(r'^\s*(\d+):\s*(.*?)\s*$', re.MULTILINE)
+_CATEGORY_SUFFIX_RE = re.compile(r'\s*\[[^\]]*\]\s*$')
+_FUNDING_BLOCK_RE = re.compile(r'=== 融资新闻 \d+ ===\s*\n标题：(.*)')
+_AMOUNT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(?:百万|千万|亿|万|M)?\s*(?:美元|USD)', re.IGNORECASE)
+_NON_WORD_RE = re.compile(r'[^\w]+')
+
+
+class FakeLLMError(Exception):
+    """Simulated API failure; mirrors the ``status_code``/``response`` of openai errors"""
+
+    def __init__(self, message: str, status_code: int, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def _stable_fraction(text: str) -> float:
+    """Deterministic value in [0, 1) derived from ``text``"""
+    return int(hashlib.sha1(text.encode('utf-8')).hexdigest()[:8], 16) / 0x100000000
+
+
+def _normalize_title(title: str) -> str:
+    return _NON_WORD_RE.sub('', _CATEGORY_SUFFIX_RE.sub('', title)).lower()
+
+
+class FakeCompletions:
+    """``chat.completions`` endpoint of the fake client"""
+
+    def __init__(self, owner: 'FakeLLMClient'):
+        self._owner = owner
+
+    def create(self, model: str = 'fake-llm', messages: List[Dict[str, Any]] = None,
+               max_tokens: Optional[int] = None, **kwargs) -> SimpleNamespace:
+        return self._owner.complete(model, messages or [], max_tokens)
+
+
+class FakeLLMClient:
+    """Drop-in for ``openai.OpenAI`` exposing ``chat.completions.create``"""
+
+    def __init__(self, latency_ms: float = 0.0, latency_dist: str = 'lognormal',
+                 latency_spread: float = 0.5, ms_per_token: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 keep_ratio: float = 0.5, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_spread = latency_spread
+        self.ms_per_token = ms_per_token
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.keep_ratio = keep_ratio
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.request_count = 0
+        self.chat = SimpleNamespace(completions=FakeCompletions(self))
+
+    @classmethod
+    def from_env(cls) -> 'FakeLLMClient':
+        return cls(
+            latency_ms=float(os.getenv('FAKE_LLM_LATENCY_MS', '0')),
+            latency_dist=os.getenv('FAKE_LLM_LATENCY_DIST', 'lognormal'),
+            latency_spread=float(os.getenv('FAKE_LLM_LATENCY_SPREAD', '0.5')),
+            ms_per_token=float(os.getenv('FAKE_LLM_MS_PER_TOKEN', '0')),
+            error_rate=float(os.getenv('FAKE_LLM_ERROR_RATE', '0')),
+            rate_limit_rate=float(os.getenv('FAKE_LLM_RATE_LIMIT_RATE', '0')),
+            keep_ratio=float(os.getenv('FAKE_LLM_KEEP_RATIO', '0.5')),
+            seed=int(os.getenv('FAKE_LLM_SEED', '0'))
+        )
+
+    def _draw(self):
+        """Latency (seconds) and failure roll of one request"""
+        with self._lock:
+            self.request_count += 1
+            if self.latency_dist == 'fixed' or self.latency_ms <= 0:
+                latency = self.latency_ms
+            elif self.latency_dist == 'uniform':
+                latency = self.latency_ms * (1 + self._random.uniform(-self.latency_spread, self.latency_spread))
+            else:
+                latency = self.latency_ms * math.exp(self._random.gauss(0, self.latency_spread))
+            roll = self._random.random()
+        return max(latency, 0.0) / 1000, roll
+
+    def complete(self, model: str, messages: List[Dict[str, Any]], max_tokens: Optional[int]) -> SimpleNamespace:
+        latency, roll = self._draw()
+        prompt = '\n'.join(str(message.get('content', '')) for message in messages)
+        content = self.answer(prompt)
+        completion_tokens = estimate_tokens(content)
+        if max_tokens is not None and completion_tokens > max_tokens:
+            completion_tokens = max_tokens
+
+        time.sleep(latency + self.ms_per_token * completion_tokens / 1000)
+
+        if roll < self.rate_limit_rate:
+            raise FakeLLMError("Rate limit reached, please try again in 200ms", 429, {'retry-after-ms': '200'})
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise FakeLLMError("Simulated server error", 500)
+
+        prompt_tokens = estimate_tokens(prompt)
+        return SimpleNamespace(
+            id=f"fake-{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]}",
+            model=model,
+            choices=[SimpleNamespace(
+                index=0,
+                message=SimpleNamespace(role='assistant', content=content),
+                finish_reason='stop'
+            )],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens
+            )
+        )
+
+    def answer(self, prompt: str) -> str:
+        """Deterministic answer in the format the prompt asks for"""
+        if '=== 融资新闻' in prompt:
+            return self._funding_json(prompt)
+        if '=== 段落精炼 ===' in prompt:
+            return self._summary(prompt)
+        if '保留的标题编号' in prompt:
+            return self._keep_list(prompt)
+        if '[[ID' in prompt:
+            return self._duplicate_groups(prompt)
+        id_lines = _ID_LINE_RE.findall(prompt)
+        if id_lines:
+            kept = [article_id for article_id, title in id_lines if self._keeps(title)]
+            return '[' + ', '.join(kept) + ']'
+        numbered_lines = _NUMBERED_LINE_RE.findall(prompt)
+        if numbered_lines:
+            kept = [number for number, title in numbered_lines if self._keeps(title)]
+            return '[' + ','.join(kept) + ']'
+        return f"fake answer {hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:8]}"
+
+    def _keeps(self, title: str) -> bool:
+        return _stable_fraction(_normalize_title(title)) < self.keep_ratio
+
+    def _keep_list(self, prompt: str) -> str:
+        """First title of each group of identical (normalized) titles"""
+        seen = set()
+        kept = []
+        for index, title in _INDEXED_LINE_RE.findall(prompt):
+            key = _normalize_title(title)
+            if key not in seen:
+                seen.add(key)
+                kept.append(index)
+        return ','.join(kept)
+
+    def _duplicate_groups(self, prompt: str) -> str:
+        """Groups of IDs whose titles are identical once normalized"""
+        groups: Dict[str, List[str]] = {}
+        for article_id, title in _ID_LINE_RE.findall(prompt.split('文章列表：', 1)[-1]):
+            groups.setdefault(_normalize_title(title), []).append(article_id)
+        duplicates = [ids for ids in groups.values() if len(ids) > 1]
+        return '[' + ', '.join('[' + ', '.join(ids) + ']' for ids in duplicates) + ']'
+
+    def _funding_json(self, prompt: str) -> str:
+        funding_list = []
+        for title in _FUNDING_BLOCK_RE.findall(prompt):
+            title = title.strip()
+            amount_match = _AMOUNT_RE.search(title)
+            funding_list.append({
+                'company': re.split(r'[\s，,:：]', title, 1)[0] or '未披露',
+                'investors': '未披露',
+                'sector': '其他',
+                'amount': f"${amount_match.group(1)}M" if amount_match else '未披露'
+            })
+        return json.dumps({'funding_list': funding_list}, ensure_ascii=False)
+
+    def _summary(self, prompt: str) -> str:
+        body = prompt.rsplit('<<<', 1)[-1].split('>>>', 1)[0]
+        sentences = [s.strip() for s in re.split(r'[。！？\n]', body) if s.strip()][:3]
+        points = '\n'.join(f"[{i}] {sentence[:30]}" for i, sentence in enumerate(sentences, 1)) or '[1] （无）'
+        return f"=== 段落精炼 ===\n{points}\n\n=== 水下信息提取 ===\n- （无）\n\n=== 金句提炼 ===\n- （无）"
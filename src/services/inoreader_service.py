@@ -3,10 +3,14 @@
 import json
 import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from .article_store import SegmentedArticleStore
+
 class InoreaderService:
     """Service for fetching articles from Inoreader feeds"""
     
@@ -22,10 +26,16 @@ class InoreaderService:
         "feed/https://www.coindesk.com/arc/outboundfeeds/rss/?outputType=xml": "Coindesk"
     }
     
-    def __init__(self, client_id: str = None, client_secret: str = None):
+    # Default size of the worker pool used for concurrent feed fetching
+    DEFAULT_FETCH_WORKERS = 4
+    
+    def __init__(self, client_id: str = None, client_secret: str = None, max_workers: int = None,
+                 store_dir: str = None):
         # 优先使用传入的参数，其次使用环境变量，最后使用默认值
         self.client_id = client_id or os.getenv('INOREADER_CLIENT_ID', '1000001559')
         self.client_secret = client_secret or os.getenv('INOREADER_CLIENT_SECRET', 'lDyl2_XuuueJYcFZOwNipRy79_TibMOH')
+        self.max_workers = max_workers or int(os.getenv('INOREADER_FETCH_WORKERS', str(self.DEFAULT_FETCH_WORKERS)))
+        self.store_dir = Path(store_dir or os.getenv('FEEDS_STORE_DIR', 'feeds_store'))
         
     def clean_html(self, html_content: str) -> str:
         """Clean HTML tags from content"""
@@ -83,25 +93,100 @@ class InoreaderService:
         
         return formatted
     
-    def fetch_feeds(self, progress_callback=None, log_callback=None) -> Dict[str, Any]:
-        """Fetch articles from Inoreader feeds"""
+    def _load_cursor(self, cursor_file: Path) -> Dict[str, Dict[str, Any]]:
+        """Load per-feed high-water marks from the cursor file"""
+        if not cursor_file.exists():
+            return {}
+        try:
+            with open(cursor_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('feeds', {})
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_cursor(self, cursor_file: Path, cursor: Dict[str, Dict[str, Any]]):
+        """Persist per-feed high-water marks next to the feeds file"""
+        with open(cursor_file, 'w', encoding='utf-8') as f:
+            json.dump({'updated_at': datetime.now().isoformat(), 'feeds': cursor},
+                      f, ensure_ascii=False, indent=2)
+    
+    def _load_existing_articles(self, latest_file: Path) -> List[Dict[str, Any]]:
+        """Load the current rolling window from the feeds file"""
+        if not latest_file.exists():
+            return []
+        try:
+            with open(latest_file, 'r', encoding='utf-8') as f:
+                return json.load(f).get('articles', [])
+        except (OSError, ValueError):
+            return []
+    
+    def _fetch_single_feed(self, client, feed_id: str, feed_name: str,
+                           cursor: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Fetch and format unread articles of one feed newer than its cursor"""
+        start_time = time.time()
+        newer_than = None
+        if cursor:
+            # Inoreader's ``ot`` works in seconds; ids are merged afterwards,
+            # so re-fetching the boundary item is harmless
+            newer_than = int(cursor.get('crawl_time_msec', 0) / 1000) or cursor.get('published') or None
         
-        # Check if we have recent data (within 24 hours)
-        latest_file = Path("latest_feeds.json")
-        if latest_file.exists():
-            file_time = datetime.fromtimestamp(latest_file.stat().st_mtime)
-            time_diff = datetime.now() - file_time
-            
-            if log_callback:
-                log_callback(f"发现已存在的feeds文件")
-                log_callback(f"创建时间: {file_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        result = {
+            'feed_name': feed_name,
+            'articles': [],
+            'latency': 0.0,
+            'error': None,
+            'cursor': cursor
+        }
+        
+        try:
+            # Get unread articles from this feed
+            fetched = client.get_unread_articles(
+                stream_id=feed_id,
+                max_articles=None,
+                include_read=False,
+                newer_than=newer_than
+            )
+        except Exception as e:
+            result['latency'] = time.time() - start_time
+            result['error'] = str(e)
+            return result
+        
+        # Format articles and add feed identifier
+        new_cursor = dict(cursor) if cursor else {'crawl_time_msec': 0, 'published': 0, 'article_id': ''}
+        for article in fetched['articles']:
+            formatted_article = self.format_article(article)
+            formatted_article['source_feed'] = feed_name
+            formatted_article['source_feed_id'] = feed_id
+            result['articles'].append(formatted_article)
             
-            if time_diff.total_seconds() < 86400:  # 24 hours
-                if log_callback:
-                    log_callback("文件较新（24小时内），使用现有文件")
-                
-                with open(latest_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            crawl_time_msec = int(article.get('crawlTimeMsec', 0) or 0)
+            if crawl_time_msec > new_cursor['crawl_time_msec']:
+                new_cursor['crawl_time_msec'] = crawl_time_msec
+                new_cursor['article_id'] = formatted_article['id']
+            new_cursor['published'] = max(new_cursor['published'], formatted_article['published'] or 0)
+        
+        result['cursor'] = new_cursor
+        result['latency'] = time.time() - start_time
+        return result
+    
+    def fetch_feeds(self, progress_callback=None, log_callback=None,
+                    concurrent: bool = True, full_refresh: bool = False) -> Dict[str, Any]:
+        """Fetch articles from Inoreader feeds
+        
+        Each feed keeps a high-water-mark cursor (latest crawl/publish
+        timestamp and article id) in ``latest_feeds_cursor.json``, so only
+        items newer than the cursor are requested. New articles are appended
+        to the day-partitioned segment store in ``store_dir``; the legacy
+        ``latest_feeds.json`` view of the 7-day window is rewritten only when
+        the store changed. ``full_refresh`` ignores the cursor and rebuilds
+        the store from scratch.
+        
+        With ``concurrent`` enabled every target feed (and its continuation
+        pages) is fetched on a bounded worker pool of ``max_workers`` threads.
+        Results are merged in ``TARGET_FEEDS`` order either way.
+        """
+        
+        latest_file = Path("latest_feeds.json")
+        cursor_file = Path("latest_feeds_cursor.json")
         
         # Import InoreaderClient from project root; fallback to mock on failure
         try:
@@ -109,72 +194,97 @@ class InoreaderService:
         except Exception:
             return self._create_mock_data(progress_callback, log_callback)
         
+        store = SegmentedArticleStore(self.store_dir, retention_days=7)
+        if full_refresh:
+            store.clear()
+        elif not len(store) and latest_file.exists():
+            # Seed the store from a legacy feeds file written before it existed
+            store.append(self._load_existing_articles(latest_file))
+        expired_segments = store.expire()
+        
+        cursors = {} if full_refresh else self._load_cursor(cursor_file)
+        
         if log_callback:
             log_callback("获取指定Feeds的未读文章")
             log_callback(f"目标feeds: {len(self.TARGET_FEEDS)} 个")
+            if cursors:
+                log_callback(f"增量模式: 已有 {len(store)} 篇文章，仅获取游标之后的新文章")
+            else:
+                log_callback("全量模式: 未找到游标，获取全部未读文章")
         
         # Create client
-        client = InoreaderClient(self.client_id, self.client_secret)
+        client = InoreaderClient(self.client_id, self.client_secret, pool_size=max(self.max_workers, 10))
         
         if not client.is_authenticated():
             if log_callback:
                 log_callback("需要认证，请运行认证程序")
             raise ValueError("Inoreader authentication required")
         
-        all_articles = []
-        feed_stats = {}
+        new_articles = []
+        new_counts = {}
+        feed_latency = {}
         
-        for feed_id, feed_name in self.TARGET_FEEDS.items():
+        feed_items = list(self.TARGET_FEEDS.items())
+        if concurrent and len(feed_items) > 1:
+            workers = max(1, min(self.max_workers, len(feed_items)))
             if log_callback:
-                log_callback(f"正在获取 {feed_name} 的未读文章...")
-            
-            try:
-                # Get unread articles from this feed
-                result = client.get_unread_articles(
-                    stream_id=feed_id,
-                    max_articles=None,
-                    include_read=False
-                )
-                
-                articles = result['articles']
-                count = len(articles)
-                
+                log_callback(f"并发获取模式: {workers} 个工作线程")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(self._fetch_single_feed, client, feed_id, feed_name, cursors.get(feed_id))
+                    for feed_id, feed_name in feed_items
+                ]
+                # Collect in TARGET_FEEDS order so the merged result is deterministic
+                results = [future.result() for future in futures]
+        else:
+            results = []
+            for feed_id, feed_name in feed_items:
                 if log_callback:
-                    log_callback(f"✓ {feed_name}: 找到 {count} 篇未读文章")
-                
-                # Format articles and add feed identifier
-                for article in articles:
-                    formatted_article = self.format_article(article)
-                    formatted_article['source_feed'] = feed_name
-                    formatted_article['source_feed_id'] = feed_id
-                    all_articles.append(formatted_article)
-                
-                feed_stats[feed_name] = count
-                
-            except Exception as e:
+                    log_callback(f"正在获取 {feed_name} 的未读文章...")
+                results.append(self._fetch_single_feed(client, feed_id, feed_name, cursors.get(feed_id)))
+        
+        for (feed_id, _), result in zip(feed_items, results):
+            feed_name = result['feed_name']
+            feed_latency[feed_name] = round(result['latency'], 3)
+            
+            if result['error']:
+                # Keep the old cursor so the next run retries the same range
                 if log_callback:
-                    log_callback(f"✗ {feed_name}: 获取失败 - {e}")
-                feed_stats[feed_name] = 0
+                    log_callback(f"✗ {feed_name}: 获取失败 - {result['error']}")
+                new_counts[feed_name] = 0
+                continue
+            
+            articles = result['articles']
+            if log_callback:
+                log_callback(f"✓ {feed_name}: 找到 {len(articles)} 篇新文章 ({result['latency']:.2f}s)")
+            
+            new_articles.extend(articles)
+            new_counts[feed_name] = len(articles)
+            if result['cursor']:
+                cursors[feed_id] = result['cursor']
+        
+        # Only ids the store has not seen are written
+        added_count = store.append(new_articles)
+        store.compact_in_background()
         
-        # Statistics
-        total_articles = len(all_articles)
         if log_callback:
-            log_callback(f"获取完成: 总计 {total_articles} 篇未读文章")
+            log_callback(f"获取完成: 获取 {len(new_articles)} 篇，新增 {added_count} 篇")
         
-        # Filter articles from last 7 days
+        # Articles from last 7 days
         seven_days_ago = datetime.now() - timedelta(days=7)
-        seven_days_timestamp = seven_days_ago.timestamp()
-        
-        original_count = len(all_articles)
-        all_articles = [article for article in all_articles 
-                       if article.get('published', 0) >= seven_days_timestamp]
+        all_articles = store.load_window(seven_days_ago.timestamp())
         filtered_count = len(all_articles)
+        original_count = max(len(store), filtered_count)
         
         if log_callback:
-            log_callback(f"应用7天时间过滤: {original_count} -> {filtered_count} 篇")
+            log_callback(f"7天窗口内共 {filtered_count} 篇文章")
         
-        # Sort by publish time (newest first)
-        all_articles.sort(key=lambda x: x.get('published', 0), reverse=True)
+        # Per-feed totals within the window
+        feed_stats = {feed_name: 0 for feed_name in self.TARGET_FEEDS.values()}
+        for article in all_articles:
+            feed_name = article.get('source_feed', '')
+            if feed_name in feed_stats:
+                feed_stats[feed_name] += 1
         
         # Prepare data to save
         save_data = {
@@ -186,17 +296,21 @@ class InoreaderService:
                 'filter_days': 7,
                 'filter_cutoff': seven_days_ago.isoformat(),
                 'feeds_stats': feed_stats,
+                'feeds_new': new_counts,
+                'feeds_latency': feed_latency,
                 'target_feeds': list(self.TARGET_FEEDS.values())
             },
             'articles': all_articles
         }
         
-        # Save to file
-        with open(latest_file, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, ensure_ascii=False, indent=2)
-        
-        if log_callback:
-            log_callback(f"数据已保存到: {latest_file}")
+        # Refresh the legacy view only when the window actually changed
+        if added_count or expired_segments or full_refresh or not latest_file.exists():
+            store.export_legacy(latest_file, save_data['metadata'], all_articles)
+            if log_callback:
+                log_callback(f"数据已保存到: {latest_file}")
+        elif log_callback:
+            log_callback(f"无新文章，{latest_file} 保持不变")
+        self._save_cursor(cursor_file, cursors)
         
         if progress_callback:
             progress_callback(100, "Fetch completed")
@@ -224,6 +338,8 @@ class InoreaderService:
                 'filter_days': 7,
                 'filter_cutoff': (datetime.now() - timedelta(days=7)).isoformat(),
                 'feeds_stats': {feed_name: 0 for feed_name in self.TARGET_FEEDS.values()},
+                'feeds_new': {},
+                'feeds_latency': {},
                 'target_feeds': list(self.TARGET_FEEDS.values())
             },
             'articles': []
@@ -0,0 +1,159 @@
+"""Persistent SQLite cache of LLM chat completion responses"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+
+DEFAULT_TTL_HOURS = 72
+DEFAULT_MAX_ENTRIES = 20000
+# Evict at most once per this many writes
+EVICTION_INTERVAL = 50
+DEFAULT_CACHE_FILE = 'llm_cache.db'
+
+
+def default_cache_path() -> str:
+    """Cache database under the ``cache`` directory of DATA_DIR"""
+    return os.path.join(os.getenv('DATA_DIR', '.'), 'cache', DEFAULT_CACHE_FILE)
+
+
+def cache_key(provider: str, request: Dict[str, Any]) -> str:
+    """Hash of provider, model, messages and every sampling parameter of a request"""
+    payload = json.dumps({'provider': provider, 'request': request},
+                         sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cached_completion(content: str, model: str) -> SimpleNamespace:
+    """Minimal stand-in for a ChatCompletion (``choices[0].message.content``)"""
+    message = SimpleNamespace(role='assistant', content=content)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(index=0, message=message, finish_reason='stop')],
+        model=model,
+        usage=None,
+        cached=True
+    )
+
+
+class LLMResponseCache:
+    """Response cache keyed by (provider, model, prompt, sampling params)
+
+    Entries expire after ``ttl_seconds``; once more than ``max_entries`` are
+    stored, the least recently used ones are evicted.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float = DEFAULT_TTL_HOURS * 3600,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._init_database()
+
+    def _init_database(self):
+        """Create the cache table and drop expired entries"""
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT NOT NULL,
+                    model TEXT,
+                    content TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    hit_count INTEGER DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_last_used ON llm_responses(last_used_at)")
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop expired entries, then least recently used ones beyond ``max_entries``"""
+        conn.execute("DELETE FROM llm_responses WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        conn.execute("""
+            DELETE FROM llm_responses WHERE key IN (
+                SELECT key FROM llm_responses ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def get(self, key: str, model: str = None) -> Optional[SimpleNamespace]:
+        """Cached completion for ``key``, or None"""
+        now = time.time()
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT content, model FROM llm_responses WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE llm_responses SET last_used_at = ?, hit_count = hit_count + 1 WHERE key = ?",
+                (now, key)
+            )
+            self.hits += 1
+        return cached_completion(row[0], row[1] or model)
+
+    def put(self, key: str, provider: str, model: str, content: str):
+        """Store the content of a completion"""
+        now = time.time()
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, provider, model, content, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider, model, content, now, now)
+            )
+            self._writes += 1
+            if self._writes % EVICTION_INTERVAL == 0:
+                self._evict(conn)
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM llm_responses")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of this process and the number of stored entries"""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total * 100) if total else 0.0,
+            'entries': entries
+        }
+
+
+_cache: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Process-wide response cache configured from the environment (None when disabled)
+
+    LLM_CACHE_FILE sets the database path (default DATA_DIR/cache/llm_cache.db,
+    empty disables caching);
+    LLM_CACHE_TTL_HOURS and LLM_CACHE_MAX_ENTRIES bound its contents.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            db_path = os.getenv('LLM_CACHE_FILE', default_cache_path())
+            if not db_path:
+                return None
+            _cache = LLMResponseCache(
+                db_path,
+                ttl_seconds=float(os.getenv('LLM_CACHE_TTL_HOURS', str(DEFAULT_TTL_HOURS))) * 3600,
+                max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', str(DEFAULT_MAX_ENTRIES)))
+            )
+        return _cache
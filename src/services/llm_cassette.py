@@ -0,0 +1,193 @@
+"""Record/replay cassettes of LLM chat completion traffic
+
+With LLM_CASSETTE_MODE=record every completion that goes through
+``rate_limiter.chat_completion`` is appended to a gzip'd JSON-lines cassette
+together with the time the provider took to answer. With
+LLM_CASSETTE_MODE=replay the same requests are answered from the cassette
+without any network access, sleeping for the recorded latency multiplied by
+LLM_CASSETTE_TIME_SCALE (1 = real time, 0 = no waiting), which makes
+``run_full_pipeline`` benchmarks on real data reproducible.
+"""
+
+import atexit
+import gzip
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+
+DEFAULT_CASSETTE_FILE = 'llm_cassette.jsonl.gz'
+CASSETTE_MODES = ('record', 'replay')
+# Stands in for a missing provider API key while replaying; never sent anywhere
+REPLAY_API_KEY = 'sk-cassette-replay'
+
+
+class CassetteMissError(LookupError):
+    """Replay found no recorded response for a request"""
+
+
+def _usage_dict(response: Any) -> Optional[Dict[str, int]]:
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return None
+    fields = ('prompt_tokens', 'completion_tokens', 'total_tokens')
+    values = {field: getattr(usage, field, None) for field in fields}
+    if not all(isinstance(value, int) for value in values.values()):
+        return None
+    return values
+
+
+def replayed_completion(entry: Dict[str, Any]) -> SimpleNamespace:
+    """ChatCompletion-shaped response rebuilt from a cassette entry"""
+    message = SimpleNamespace(role='assistant', content=entry['content'])
+    usage = entry.get('usage')
+    return SimpleNamespace(
+        id=entry.get('id'),
+        model=entry.get('model'),
+        choices=[SimpleNamespace(index=0, message=message, finish_reason=entry.get('finish_reason', 'stop'))],
+        usage=SimpleNamespace(**usage) if usage else None,
+        replayed=True
+    )
+
+
+class LLMCassette:
+    """One cassette file, either being recorded or replayed
+
+    Entries are keyed by the request hash of ``llm_cache.cache_key``. A
+    request issued several times is answered with its recordings in order;
+    once they run out the last one is repeated.
+    """
+
+    def __init__(self, path: str, mode: str, time_scale: float = 1.0):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unsupported cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.time_scale = time_scale
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self.replayed_latency = 0.0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._positions: Dict[str, int] = defaultdict(int)
+        self._file = None
+
+        if mode == 'record':
+            self._file = gzip.open(path, 'wt', encoding='utf-8')
+            atexit.register(self.close)
+        else:
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry['key']].append(entry)
+            except EOFError:
+                # Recording process did not close the file; keep what was flushed
+                pass
+
+    def wrap(self, key: str, provider: str, create: Callable[..., Any]) -> Callable[..., Any]:
+        """Stand-in for ``create`` that records or replays the request hashed as ``key``"""
+        if self.mode == 'replay':
+            return lambda **kwargs: self._replay(key)
+
+        def record(**kwargs):
+            started = time.perf_counter()
+            response = create(**kwargs)
+            self._record(key, provider, kwargs.get('model'), response, time.perf_counter() - started)
+            return response
+        return record
+
+    def _record(self, key: str, provider: str, model: Optional[str], response: Any, latency: float):
+        content = response.choices[0].message.content if getattr(response, 'choices', None) else None
+        if not isinstance(content, str):
+            return
+        entry = {
+            'key': key,
+            'provider': provider,
+            'model': getattr(response, 'model', None) or model,
+            'id': getattr(response, 'id', None),
+            'content': content,
+            'finish_reason': getattr(response.choices[0], 'finish_reason', None) or 'stop',
+            'usage': _usage_dict(response),
+            'latency': round(latency, 4)
+        }
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            # Sync-flush so a crashed run still leaves a readable cassette
+            self._file.flush()
+            self.recorded += 1
+
+    def _replay(self, key: str) -> SimpleNamespace:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMissError(f"No recorded LLM response for request {key[:12]} in {self.path}")
+            position = self._positions[key]
+            self._positions[key] = position + 1
+            entry = entries[min(position, len(entries) - 1)]
+            delay = entry.get('latency', 0.0) * self.time_scale
+            self.replayed += 1
+            self.replayed_latency += delay
+
+        if delay > 0:
+            time.sleep(delay)
+        return replayed_completion(entry)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'path': self.path,
+            'recorded': self.recorded,
+            'replayed': self.replayed,
+            'misses': self.misses,
+            'replayed_latency_seconds': round(self.replayed_latency, 2)
+        }
+
+
+_cassette: Optional[LLMCassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_llm_cassette() -> Optional[LLMCassette]:
+    """Process-wide cassette configured from the environment (None unless a mode is set)
+
+    LLM_CASSETTE_MODE is ``record`` or ``replay``; LLM_CASSETTE_FILE sets the
+    path and LLM_CASSETTE_TIME_SCALE scales replayed latencies.
+    """
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            mode = os.getenv('LLM_CASSETTE_MODE', '').strip().lower()
+            if not mode:
+                return None
+            _cassette = LLMCassette(
+                os.getenv('LLM_CASSETTE_FILE', DEFAULT_CASSETTE_FILE),
+                mode,
+                time_scale=float(os.getenv('LLM_CASSETTE_TIME_SCALE', '1.0'))
+            )
+        return _cassette
+
+
+def is_replaying() -> bool:
+    """True while LLM traffic is answered from a cassette (no provider key needed)"""
+    cassette = get_llm_cassette()
+    return cassette is not None and cassette.mode == 'replay'
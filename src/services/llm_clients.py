@@ -0,0 +1,62 @@
+"""Process-wide registry of long-lived OpenAI-compatible API clients"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import openai
+
+from .fake_llm import FakeLLMClient
+from .llm_cassette import REPLAY_API_KEY, is_replaying
+
+
+DEFAULT_BASE_URLS = {
+    'deepseek': 'https://api.deepseek.com',
+}
+
+# Connection pool and timeouts of every client; override via the environment
+DEFAULT_POOL_SIZE = 20
+DEFAULT_TIMEOUT = 60.0
+CONNECT_TIMEOUT = 10.0
+
+_clients: Dict[Tuple[str, Optional[str], str], openai.OpenAI] = {}
+_clients_lock = threading.Lock()
+
+
+def _build_client(api_key: str, base_url: Optional[str]) -> openai.OpenAI:
+    pool_size = int(os.getenv('LLM_HTTP_POOL_SIZE', str(DEFAULT_POOL_SIZE)))
+    timeout = openai.Timeout(float(os.getenv('LLM_HTTP_TIMEOUT', str(DEFAULT_TIMEOUT))), connect=CONNECT_TIMEOUT)
+    # Limits class of whichever HTTP library this openai release is built on
+    limits_class = type(openai.DEFAULT_CONNECTION_LIMITS)
+    http_client = openai.DefaultHttpxClient(
+        timeout=timeout,
+        limits=limits_class(max_connections=pool_size, max_keepalive_connections=pool_size)
+    )
+    return openai.OpenAI(api_key=api_key, base_url=base_url, timeout=timeout, http_client=http_client)
+
+
+def get_llm_client(provider: str, api_key: str, base_url: Optional[str] = None) -> openai.OpenAI:
+    """Shared client for (provider, base URL, API key), created on first use
+
+    Clients are thread-safe and keep their HTTP connections alive, so every
+    service and worker thread using the same credentials reuses one pool.
+    Nothing is written to the module-level ``openai.api_key``/``base_url``.
+    Provider ``"fake"`` gets a ``FakeLLMClient`` configured from FAKE_LLM_*.
+    While a cassette is replaying, a missing API key is replaced by a
+    placeholder, since no request leaves the process.
+    """
+    provider = (provider or 'openai').lower()
+    if not api_key and is_replaying():
+        api_key = REPLAY_API_KEY
+    base_url = base_url or DEFAULT_BASE_URLS.get(provider)
+    key = (provider, base_url, api_key)
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if provider == 'fake':
+                client = FakeLLMClient.from_env()
+            else:
+                client = _build_client(api_key, base_url)
+            _clients[key] = client
+        return client
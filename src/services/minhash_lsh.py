@@ -0,0 +1,93 @@
+"""MinHash signatures and LSH banding for near-duplicate candidate generation
+
+Each document is a set of shingles. Its MinHash signature keeps, for every
+one of ``num_perm`` hash functions, the smallest hash over the shingles, so
+two signatures agree in a position with probability equal to the Jaccard
+similarity of the shingle sets. LSH cuts the signature into ``bands`` bands
+of ``rows`` positions; documents sharing a whole band land in the same
+bucket and become a candidate pair. A pair of Jaccard similarity ``s`` is a
+candidate with probability ``1 - (1 - s**rows)**bands``, so only pairs near
+or above roughly ``(1 / bands) ** (1 / rows)`` are proposed and the cost
+grows with the number of documents instead of the number of pairs.
+"""
+
+import zlib
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+
+# Documents hashed per chunk; bounds the (shingles x num_perm) work array
+SIGNATURE_CHUNK_SIZE = 1000
+
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+class MinHashLSH:
+    """MinHash signer and LSH bucketer with ``bands * rows`` hash functions"""
+
+    def __init__(self, bands: int = 32, rows: int = 3, seed: int = 1):
+        if bands < 1 or rows < 1:
+            raise ValueError("bands and rows must be positive")
+        self.bands = bands
+        self.rows = rows
+        self.num_perm = bands * rows
+
+        generator = np.random.default_rng(seed)
+        # Multiply-shift hashing: (a * x + b) mod 2**64, upper 32 bits; a odd
+        self._a = generator.integers(1, 2 ** 63, size=self.num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = generator.integers(0, 2 ** 63, size=self.num_perm, dtype=np.uint64)
+        # Mixes the rows of a band into one bucket key
+        self._band_mix = generator.integers(1, 2 ** 63, size=rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+    @property
+    def threshold(self) -> float:
+        """Jaccard similarity at which a pair is a candidate about half the time"""
+        return (1 / self.bands) ** (1 / self.rows)
+
+    def signatures(self, shingle_sets: Sequence[Iterable[str]]) -> np.ndarray:
+        """(n, num_perm) uint64 MinHash signatures; an empty set gets all-max values"""
+        n = len(shingle_sets)
+        result = np.full((n, self.num_perm), _MAX_HASH, dtype=np.uint64)
+
+        for start in range(0, n, SIGNATURE_CHUNK_SIZE):
+            hashes, owners = [], []
+            for offset, shingles in enumerate(shingle_sets[start:start + SIGNATURE_CHUNK_SIZE]):
+                values = {zlib.crc32(shingle.encode('utf-8')) for shingle in shingles}
+                hashes.extend(values)
+                owners.extend([offset] * len(values))
+            if not hashes:
+                continue
+
+            hashes = np.array(hashes, dtype=np.uint64)
+            owners = np.array(owners, dtype=np.int64)
+            permuted = (np.outer(hashes, self._a) + self._b) >> np.uint64(32)
+            # Owners are contiguous runs, so reduceat takes each document's minimum
+            starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+            result[start + owners[starts]] = np.minimum.reduceat(permuted, starts, axis=0)
+
+        return result
+
+    def candidate_pairs(self, signatures: np.ndarray) -> List[List[int]]:
+        """For every row i, the rows j > i sharing at least one band bucket, ascending"""
+        n = signatures.shape[0]
+        pairs = set()
+
+        for band in range(self.bands):
+            band_rows = signatures[:, band * self.rows:(band + 1) * self.rows]
+            keys = (band_rows * self._band_mix).sum(axis=1)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            # Runs of equal keys are buckets; only buckets of 2+ documents matter
+            starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+            ends = np.r_[starts[1:], n]
+            for start, end in zip(starts[ends - starts > 1].tolist(), ends[ends - starts > 1].tolist()):
+                members = sorted(order[start:end].tolist())
+                for index, i in enumerate(members):
+                    for j in members[index + 1:]:
+                        pairs.add((i, j))
+
+        neighbours: List[List[int]] = [[] for _ in range(n)]
+        for i, j in sorted(pairs):
+            neighbours[i].append(j)
+        return neighbours
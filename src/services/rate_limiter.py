@@ -0,0 +1,268 @@
+"""Token-bucket rate limiting for LLM API calls"""
+
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .llm_cache import cache_key, get_llm_cache
+from .llm_cassette import get_llm_cassette
+
+
+# Default per-provider budgets (requests per minute, tokens per minute);
+# override with <PROVIDER>_RPM_LIMIT / <PROVIDER>_TPM_LIMIT
+DEFAULT_LIMITS = {
+    'openai': (500, 200000),
+    'deepseek': (300, 300000),
+    # Local fake provider (fake_llm); high enough not to throttle load tests
+    'fake': (60000, 100000000),
+}
+FALLBACK_LIMITS = (60, 60000)
+
+# Retries of a single call after HTTP 429
+MAX_RATE_LIMIT_RETRIES = 5
+# Backoff used when a 429 carries no retry hint
+DEFAULT_RETRY_SECONDS = 2.0
+MAX_RETRY_SECONDS = 60.0
+
+_CJK_RE = re.compile(r'[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]')
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1.0, 'm': 60.0, 'h': 3600.0}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: one per CJK character, one per four other characters"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_message_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough prompt token count of a chat message list"""
+    # A few tokens of per-message framing on top of the content
+    return sum(estimate_tokens(str(message.get('content', ''))) + 4 for message in messages) + 3
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse a retry hint: plain seconds ("2", "0.5") or Go-style ("1m30s", "250ms")"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server retry hint carried by a rate-limit error, in seconds"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    hints = []
+    for header in ('retry-after', 'x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens'):
+        value = headers.get(header)
+        if value:
+            seconds = _parse_duration(value)
+            if seconds is not None:
+                hints.append(seconds)
+    if hints:
+        return max(hints)
+
+    # Fall back to "try again in 1.5s" style hints in the error message
+    match = re.search(r'try again in ((?:\d+(?:\.\d+)?(?:ms|h|m|s))+)', str(error))
+    if match:
+        return _parse_duration(match.group(1))
+    return None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for HTTP 429 errors raised by the openai client (or compatible)"""
+    if getattr(error, 'status_code', None) == 429:
+        return True
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) == 429
+
+
+class TokenBucket:
+    """Bucket holding up to ``capacity`` units, refilled continuously per minute
+
+    Reservations may drive the level negative; the caller then waits until
+    the deficit has been refilled, so waiting callers are served in order.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` units; returns seconds until they are actually available"""
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+        return -self.level / self.rate if self.level < 0 else 0.0
+
+    def refund(self, amount: float, now: float):
+        """Give back units reserved but not used"""
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """Thread-safe requests-per-minute and tokens-per-minute limiter of one provider"""
+
+    def __init__(self, provider: str, rpm: int, tpm: int):
+        self.provider = provider
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        self.total_requests = 0
+        self.total_wait_seconds = 0.0
+        self.rate_limit_hits = 0
+
+    def acquire(self, tokens: int) -> float:
+        """Block until one request and ``tokens`` tokens fit the budget; returns seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(
+                self._requests.reserve(1, now),
+                self._tokens.reserve(tokens, now),
+                self._blocked_until - now
+            )
+            self.total_requests += 1
+            self.total_wait_seconds += max(wait, 0.0)
+
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def release_unused(self, reserved_tokens: int, used_tokens: int):
+        """Return over-estimated tokens once the actual usage is known"""
+        if used_tokens < reserved_tokens:
+            with self._lock:
+                self._tokens.refund(reserved_tokens - used_tokens, time.monotonic())
+
+    def block_for(self, seconds: float):
+        """Pause every caller of this provider for ``seconds`` (after a 429)"""
+        with self._lock:
+            self.rate_limit_hits += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def call(self, func: Callable[..., Any], messages: List[Dict[str, Any]],
+             max_tokens: Optional[int] = None, **kwargs) -> Any:
+        """Invoke ``func(messages=..., max_tokens=..., **kwargs)`` within the budget
+
+        The reservation covers the estimated prompt plus ``max_tokens`` of
+        completion. On HTTP 429 every caller of the provider backs off for
+        the server's retry hint (exponential backoff without one) and the
+        call is retried; other errors propagate unchanged.
+        """
+        reserved = estimate_message_tokens(messages) + (max_tokens or 0)
+        if max_tokens is not None:
+            kwargs['max_tokens'] = max_tokens
+
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self.acquire(reserved)
+            try:
+                response = func(messages=messages, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == MAX_RATE_LIMIT_RETRIES:
+                    raise
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = DEFAULT_RETRY_SECONDS * (2 ** attempt)
+                delay = min(delay, MAX_RETRY_SECONDS)
+                print(f"  ⏳ {self.provider} rate limited, retrying in {delay:.1f}s")
+                self.block_for(delay)
+                continue
+
+            usage = getattr(response, 'usage', None)
+            used = getattr(usage, 'total_tokens', None)
+            if isinstance(used, int):
+                self.release_unused(reserved, used)
+            return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'provider': self.provider,
+            'rpm': self.rpm,
+            'tpm': self.tpm,
+            'total_requests': self.total_requests,
+            'total_wait_seconds': round(self.total_wait_seconds, 2),
+            'rate_limit_hits': self.rate_limit_hits
+        }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Process-wide limiter of a provider, configured from the environment on first use"""
+    provider = (provider or 'openai').lower()
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            rpm, tpm = DEFAULT_LIMITS.get(provider, FALLBACK_LIMITS)
+            rpm = int(os.getenv(f"{provider.upper()}_RPM_LIMIT", str(rpm)))
+            tpm = int(os.getenv(f"{provider.upper()}_TPM_LIMIT", str(tpm)))
+            limiter = _limiters[provider] = RateLimiter(provider, rpm, tpm)
+        return limiter
+
+
+def chat_completion(client: Any, provider: str, use_cache: Optional[bool] = None, **kwargs) -> Any:
+    """``client.chat.completions.create(**kwargs)`` through the provider's limiter
+
+    Identical requests (same provider, model, messages and sampling
+    parameters) are answered from the persistent LLM response cache without
+    touching the rate budget. By default only ``temperature=0`` requests use
+    the cache, since replaying a sampled answer would pin a run's output to
+    whatever an earlier run drew; ``use_cache`` overrides that per call.
+    The fake provider never uses the cache: load tests must see its simulated
+    latency and failures on every run, and its answers do not belong in the
+    production cache. While an LLM cassette is recording or replaying, the
+    response cache is bypassed so every request reaches it.
+    """
+    cassette = get_llm_cassette()
+    if cassette is not None:
+        create = cassette.wrap(cache_key(provider, kwargs), provider, client.chat.completions.create)
+        return get_rate_limiter(provider).call(create, **kwargs)
+
+    if (provider or '').lower() == 'fake':
+        use_cache = False
+    elif use_cache is None:
+        use_cache = kwargs.get('temperature') == 0
+    cache = get_llm_cache() if use_cache else None
+    if cache is None:
+        return get_rate_limiter(provider).call(client.chat.completions.create, **kwargs)
+
+    key = cache_key(provider, kwargs)
+    cached = cache.get(key, kwargs.get('model'))
+    if cached is not None:
+        return cached
+
+    response = get_rate_limiter(provider).call(client.chat.completions.create, **kwargs)
+    content = response.choices[0].message.content if getattr(response, 'choices', None) else None
+    if isinstance(content, str) and content.strip():
+        cache.put(key, provider, kwargs.get('model'), content)
+    return response
@@ -10,6 +10,8 @@ from pathlib import Path
 import yaml
 import openai
 
+from .rate_limiter import chat_completion
+
 
 class ReportGenerator:
     """Generate formatted report following the original IOSG format"""
@@ -131,7 +133,8 @@ class ReportGenerator:
             )
             
             # Call AI API
-            response = self.ai_service.client.chat.completions.create(
+            response = chat_completion(
+                self.ai_service.client, getattr(self.ai_service, 'provider', 'openai'),
                 model=self.ai_service.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=4000,
@@ -206,7 +209,8 @@ class ReportGenerator:
             prompt = prompt_template.format(article_text=article_content)
             
             # Call AI API
-            response = self.ai_service.client.chat.completions.create(
+            response = chat_completion(
+                self.ai_service.client, getattr(self.ai_service, 'provider', 'openai'),
                 model=self.ai_service.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=1500,
@@ -0,0 +1,235 @@
+"""Persistent SimHash index of articles that already went into a report"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+FINGERPRINT_BITS = 64
+_FINGERPRINT_MASK = (1 << FINGERPRINT_BITS) - 1
+
+# Reported articles older than this can no longer suppress new ones
+DEFAULT_RETENTION_DAYS = 7
+# Largest Hamming distance between fingerprints that is looked up. Titles
+# are short, so one added word flips several bits; 7 (eight 8-bit tables)
+# still inspects only ~3% of the window per lookup
+DEFAULT_MAX_DISTANCE = 7
+
+
+def daily_report_id(timestamp: Optional[float] = None) -> str:
+    """Id of the daily report covering ``timestamp`` (default now): its local date"""
+    return time.strftime('%Y-%m-%d', time.localtime(timestamp))
+
+
+def simhash(weighted_tokens: Dict[str, float]) -> int:
+    """64-bit SimHash of {token: weight}; similar token sets give nearby fingerprints"""
+    totals = [0.0] * FINGERPRINT_BITS
+    for token, weight in weighted_tokens.items():
+        value = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                totals[bit] += weight
+            else:
+                totals[bit] -= weight
+    return sum(1 << bit for bit, total in enumerate(totals) if total > 0)
+
+
+def hamming_distance(fingerprint1: int, fingerprint2: int) -> int:
+    return bin(fingerprint1 ^ fingerprint2).count('1')
+
+
+def _block_layout(max_distance: int) -> List[Tuple[int, int]]:
+    """(shift, mask) of ``max_distance + 1`` disjoint blocks covering the fingerprint
+
+    Fingerprints at most ``max_distance`` bits apart differ in at most that
+    many blocks, so they agree exactly on at least one (pigeonhole).
+    """
+    blocks = max_distance + 1
+    layout = []
+    shift = 0
+    for index in range(blocks):
+        width = FINGERPRINT_BITS // blocks + (1 if index < FINGERPRINT_BITS % blocks else 0)
+        layout.append((shift, (1 << width) - 1))
+        shift += width
+    return layout
+
+
+class ReportedFingerprintIndex:
+    """SimHash fingerprints of reported articles with multi-table Hamming lookup
+
+    Entries live in SQLite and are loaded on open into one in-memory table
+    per fingerprint block (see ``_block_layout``), so a lookup only inspects
+    the entries sharing a block with the query instead of the whole window.
+    An optional exact ``feature_key`` (e.g. company and amount of a deal)
+    gets a table of its own, since rewordings of a short title can land
+    farther apart than ``max_distance``.
+    Every entry records the ``report_id`` of the report it went into, so a
+    re-run of that report can tell its own entries from earlier reports.
+    Entries older than ``retention_days`` are ignored by lookups and deleted
+    on open and whenever new entries are added.
+    """
+
+    def __init__(self, db_path: str, retention_days: int = DEFAULT_RETENTION_DAYS,
+                 max_distance: int = DEFAULT_MAX_DISTANCE):
+        if not 0 <= max_distance < FINGERPRINT_BITS:
+            raise ValueError(f"max_distance must be between 0 and {FINGERPRINT_BITS - 1}")
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.max_distance = max_distance
+        self.lookups = 0
+        self.matches = 0
+        self._lock = threading.Lock()
+        self._layout = _block_layout(max_distance)
+        # entry id -> (fingerprint, article key, title, report id, reported at)
+        self._entries: Dict[int, Tuple[int, str, str, str, float]] = {}
+        # one table per block: block value -> entry ids
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._layout]
+        # feature key -> entry ids
+        self._feature_table: Dict[str, List[int]] = {}
+        self._init_database()
+        self._load()
+
+    def _cutoff(self) -> float:
+        return time.time() - self.retention_days * 86400
+
+    def _init_database(self):
+        """Create the fingerprint table and drop expired entries"""
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS reported_fingerprints (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    fingerprint INTEGER NOT NULL,
+                    article_key TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    feature_key TEXT NOT NULL DEFAULT '',
+                    report_id TEXT NOT NULL DEFAULT '',
+                    reported_at REAL NOT NULL
+                )
+            """)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(reported_fingerprints)")}
+            if 'report_id' not in columns:
+                conn.execute("ALTER TABLE reported_fingerprints ADD COLUMN report_id TEXT NOT NULL DEFAULT ''")
+            conn.execute("DELETE FROM reported_fingerprints WHERE reported_at < ?", (self._cutoff(),))
+
+    def _load(self):
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT id, fingerprint, article_key, title, feature_key, report_id, reported_at "
+                "FROM reported_fingerprints"
+            ).fetchall()
+            for entry_id, fingerprint, article_key, title, feature_key, report_id, reported_at in rows:
+                self._insert(entry_id, fingerprint & _FINGERPRINT_MASK, article_key, title, feature_key,
+                             report_id, reported_at)
+
+    def _insert(self, entry_id: int, fingerprint: int, article_key: str, title: str,
+                feature_key: str, report_id: str, reported_at: float):
+        self._entries[entry_id] = (fingerprint, article_key, title, report_id, reported_at)
+        for table, (shift, mask) in zip(self._tables, self._layout):
+            table.setdefault(fingerprint >> shift & mask, []).append(entry_id)
+        if feature_key:
+            self._feature_table.setdefault(feature_key, []).append(entry_id)
+
+    def _expire(self, cutoff: float):
+        """Drop in-memory entries reported before ``cutoff``"""
+        expired = {entry_id for entry_id, entry in self._entries.items() if entry[4] < cutoff}
+        if not expired:
+            return
+        for entry_id in expired:
+            del self._entries[entry_id]
+        for table in self._tables + [self._feature_table]:
+            for block in list(table):
+                kept = [entry_id for entry_id in table[block] if entry_id not in expired]
+                if kept:
+                    table[block] = kept
+                else:
+                    del table[block]
+
+    def find(self, fingerprint: int, feature_key: str = '') -> List[Dict]:
+        """Reported entries within ``max_distance`` of ``fingerprint`` or sharing ``feature_key``, nearest first"""
+        cutoff = self._cutoff()
+        with self._lock:
+            self.lookups += 1
+            candidate_ids = set()
+            for table, (shift, mask) in zip(self._tables, self._layout):
+                candidate_ids.update(table.get(fingerprint >> shift & mask, ()))
+            same_feature = set(self._feature_table.get(feature_key, ())) if feature_key else set()
+
+            found = []
+            for entry_id in candidate_ids | same_feature:
+                entry_fingerprint, article_key, title, report_id, reported_at = self._entries[entry_id]
+                distance = hamming_distance(fingerprint, entry_fingerprint)
+                if (distance <= self.max_distance or entry_id in same_feature) and reported_at >= cutoff:
+                    found.append({
+                        'article_key': article_key,
+                        'title': title,
+                        'report_id': report_id,
+                        'reported_at': reported_at,
+                        'distance': distance
+                    })
+            if found:
+                self.matches += 1
+
+        return sorted(found, key=lambda entry: (entry['distance'], -entry['reported_at']))
+
+    def add_many(self, entries: Iterable[Tuple[int, str, str, str]], report_id: str = ''):
+        """Store (fingerprint, article_key, title, feature_key) of articles that went into report ``report_id``"""
+        entries = list(entries)
+        now = time.time()
+        cutoff = self._cutoff()
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM reported_fingerprints WHERE reported_at < ?", (cutoff,))
+            self._expire(cutoff)
+            for fingerprint, article_key, title, feature_key in entries:
+                fingerprint &= _FINGERPRINT_MASK
+                # SQLite integers are signed 64-bit
+                stored = fingerprint - (1 << FINGERPRINT_BITS) if fingerprint >> (FINGERPRINT_BITS - 1) else fingerprint
+                cursor = conn.execute(
+                    "INSERT INTO reported_fingerprints "
+                    "(fingerprint, article_key, title, feature_key, report_id, reported_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (stored, article_key, title, feature_key, report_id, now)
+                )
+                self._insert(cursor.lastrowid, fingerprint, article_key, title, feature_key, report_id, now)
+
+    def clear(self):
+        """Remove every stored fingerprint"""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM reported_fingerprints")
+            self._entries.clear()
+            for table in self._tables + [self._feature_table]:
+                table.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'lookups': self.lookups,
+            'matches': self.matches
+        }
+
+
+_index: Optional[ReportedFingerprintIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_reported_index() -> Optional[ReportedFingerprintIndex]:
+    """Process-wide index configured from the environment (None when disabled)
+
+    Opt-in: REPORTED_INDEX_FILE sets the database path and the index is off
+    while it is unset or empty. REPORTED_RETENTION_DAYS and
+    REPORTED_MAX_DISTANCE tune it.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            db_path = os.getenv('REPORTED_INDEX_FILE', '')
+            if not db_path:
+                return None
+            _index = ReportedFingerprintIndex(
+                db_path,
+                retention_days=int(os.getenv('REPORTED_RETENTION_DAYS', str(DEFAULT_RETENTION_DAYS))),
+                max_distance=int(os.getenv('REPORTED_MAX_DISTANCE', str(DEFAULT_MAX_DISTANCE)))
+            )
+        return _index
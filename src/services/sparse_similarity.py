@@ -0,0 +1,80 @@
+"""Blockwise sparse cosine similarity for large TF-IDF matrices
+
+``sklearn.metrics.pairwise.cosine_similarity`` materializes the dense n x n
+float64 matrix: about 3.2 GB for 20k articles. Deduplication only looks at
+pairs above a threshold, so the routine here multiplies one block of rows
+at a time against the whole matrix in float32 and keeps just the entries
+that pass, returning them as a sparse COO matrix. Peak memory is bounded by
+the block (``block_rows`` x n floats) plus the kept entries. The kept
+entries are recomputed in float64, so the threshold test agrees with the
+dense float64 result.
+"""
+
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+
+
+# Dense floats per block (64 MB in float32) when block_rows is not given
+DEFAULT_BLOCK_ELEMENTS = 1 << 24
+# Slack below min_similarity for the float32 pass; the float64 check is exact
+FLOAT32_MARGIN = 1e-4
+# Pairs recomputed in float64 per step
+RECHECK_PAIRS = 1 << 20
+
+
+def blockwise_cosine_similarity(vectors, min_similarity: float = 0.0, top_k: Optional[int] = None,
+                                block_rows: Optional[int] = None, upper: bool = True) -> sparse.coo_matrix:
+    """
+    Cosine similarities of the rows of ``vectors`` as a float64 COO matrix
+
+    Only nonzero similarities >= ``min_similarity`` are kept, and with
+    ``top_k`` only the k largest of each row (ties included). With ``upper``
+    (the default) only pairs j > i are returned, which is all keep-first
+    deduplication needs; otherwise every pair but the diagonal. Entries come
+    out sorted by row, then column.
+    """
+    exact = sparse.csr_matrix(vectors, dtype=np.float64)
+    n = exact.shape[0]
+
+    norms = np.sqrt(np.asarray(exact.multiply(exact).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    exact = sparse.diags(1.0 / norms).dot(exact).tocsr()
+    vectors = exact.astype(np.float32)
+    transposed = vectors.T.tocsc()
+
+    if block_rows is None:
+        block_rows = max(1, DEFAULT_BLOCK_ELEMENTS // max(n, 1))
+
+    rows, cols = [], []
+    for start in range(0, n, block_rows):
+        block = vectors[start:start + block_rows].dot(transposed).toarray()
+        if upper:
+            # Drop the diagonal and everything left of it
+            block = np.triu(block, k=start + 1)
+        else:
+            block[np.arange(block.shape[0]), np.arange(start, start + block.shape[0])] = 0
+
+        keep = (block >= min_similarity - FLOAT32_MARGIN) & (block > 0)
+        if top_k is not None and top_k < n:
+            # Everything below each row's k-th largest value is dropped
+            kth = -np.partition(-block, top_k - 1, axis=1)[:, top_k - 1:top_k]
+            keep &= block >= kth
+
+        block_rows_index, block_cols = np.nonzero(keep)
+        rows.append(block_rows_index + start)
+        cols.append(block_cols)
+
+    if rows:
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+    else:
+        rows, cols = np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    # The float32 pass may be off by rounding near min_similarity
+    values = np.empty(len(rows), dtype=np.float64)
+    for start in range(0, len(rows), RECHECK_PAIRS):
+        end = start + RECHECK_PAIRS
+        values[start:end] = np.asarray(exact[rows[start:end]].multiply(exact[cols[start:end]]).sum(axis=1)).ravel()
+    keep = (values >= min_similarity) & (values > 0)
+    return sparse.coo_matrix((values[keep], (rows[keep], cols[keep])), shape=(n, n))
@@ -0,0 +1,100 @@
+"""Persistent per-article AI filter verdicts"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+
+# Verdicts older than this are dropped on open; they can no longer be in the window
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_VERDICT_FILE = 'ai_verdicts.db'
+
+
+def default_verdict_path() -> str:
+    """Verdict database under the ``cache`` directory of DATA_DIR"""
+    return os.path.join(os.getenv('DATA_DIR', '.'), 'cache', DEFAULT_VERDICT_FILE)
+
+
+class ArticleVerdictStore:
+    """SQLite store of keep/discard verdicts keyed by (article, category, criteria version)
+
+    The criteria version is a hash of everything that shapes the filter
+    prompt of a category, so editing its template or criteria in
+    ``crypto_config.yaml`` (or switching models) makes old verdicts miss.
+    """
+
+    def __init__(self, db_path: str, retention_days: int = DEFAULT_RETENTION_DAYS):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._init_database()
+
+    def _init_database(self):
+        """Create the verdict table and drop expired verdicts"""
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS article_verdicts (
+                    article_key TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    criteria_version TEXT NOT NULL,
+                    keep INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (article_key, category, criteria_version)
+                )
+            """)
+            conn.execute("DELETE FROM article_verdicts WHERE created_at < ?",
+                         (time.time() - self.retention_days * 86400,))
+
+    def get_many(self, category: str, criteria_version: str,
+                 article_keys: Iterable[str]) -> Dict[str, bool]:
+        """Known verdicts of the given articles; returns {article_key: keep}"""
+        article_keys = list(dict.fromkeys(article_keys))
+        verdicts = {}
+
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(article_keys), 500):
+                chunk = article_keys[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT article_key, keep FROM article_verdicts "
+                    f"WHERE category = ? AND criteria_version = ? AND article_key IN ({placeholders})",
+                    [category, criteria_version] + chunk
+                ).fetchall()
+                for article_key, keep in rows:
+                    verdicts[article_key] = bool(keep)
+
+            self.hits += len(verdicts)
+            self.misses += len(article_keys) - len(verdicts)
+
+        return verdicts
+
+    def put_many(self, category: str, criteria_version: str, verdicts: List[Tuple[str, bool]]):
+        """Store (article_key, keep) verdicts"""
+        if not verdicts:
+            return
+        now = time.time()
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO article_verdicts "
+                "(article_key, category, criteria_version, keep, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(article_key, category, criteria_version, int(keep), now) for article_key, keep in verdicts]
+            )
+
+    def clear(self):
+        """Remove every stored verdict"""
+        with self._lock, sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM article_verdicts")
+
+    def get_stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / total * 100) if total else 0.0
+        }
@@ -6,6 +6,8 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 import yaml
 
+from .keyword_matcher import PhraseMatcher, get_phrase_matcher
+
 
 @dataclass 
 class Settings:
@@ -25,6 +27,10 @@ class Settings:
     deepseek_base_url: str = field(default="https://api.deepseek.com")
     default_ai_provider: str = field(default="openai")
     ai_batch_size: int = field(default=20)
+    ai_filter_max_in_flight: int = field(default=4)  # 1 = sequential
+    ai_batch_token_budget: int = field(default=1500)  # 0 = fixed ai_batch_size batches
+    ai_prefilter_threshold: float = field(default=0.0)  # 0 = off, every article goes to the AI filter
+    dedup_lsh_min_articles: int = field(default=0)  # 0 = off, dedup always compares every pair
     
     # Email settings
     mail_server: str = field(default="smtp.gmail.com")
@@ -54,6 +60,10 @@ class Settings:
         self.deepseek_base_url = os.getenv("DEEPSEEK_BASE_URL", self.deepseek_base_url)
         self.default_ai_provider = os.getenv("DEFAULT_AI_PROVIDER", self.default_ai_provider)
         self.ai_batch_size = int(os.getenv("AI_BATCH_SIZE", str(self.ai_batch_size)))
+        self.ai_filter_max_in_flight = int(os.getenv("AI_FILTER_MAX_IN_FLIGHT", str(self.ai_filter_max_in_flight)))
+        self.ai_batch_token_budget = int(os.getenv("AI_BATCH_TOKEN_BUDGET", str(self.ai_batch_token_budget)))
+        self.ai_prefilter_threshold = float(os.getenv("AI_PREFILTER_THRESHOLD", str(self.ai_prefilter_threshold)))
+        self.dedup_lsh_min_articles = int(os.getenv("DEDUP_LSH_MIN_ARTICLES", str(self.dedup_lsh_min_articles)))
         
         self.mail_server = os.getenv("MAIL_SERVER", self.mail_server)
         self.mail_port = int(os.getenv("MAIL_PORT", str(self.mail_port)))
@@ -92,7 +102,10 @@ class Settings:
             'deepseek_api_key': self.deepseek_api_key,
             'deepseek_base_url': self.deepseek_base_url,
             'default_provider': self.default_ai_provider,
-            'batch_size': self.ai_batch_size
+            'batch_size': self.ai_batch_size,
+            'max_in_flight': self.ai_filter_max_in_flight,
+            'batch_token_budget': self.ai_batch_token_budget,
+            'prefilter_threshold': self.ai_prefilter_threshold
         }
 
 
@@ -118,6 +131,14 @@ class CryptoConfig:
         """Get list of portfolio projects"""
         return self._config_data.get('portfolio_projects', [])
     
+    def get_portfolio_matcher(self) -> PhraseMatcher:
+        """Get the shared compiled matcher for portfolio project names"""
+        return get_phrase_matcher(self.get_portfolio_projects())
+    
+    def get_exclusion_matcher(self) -> PhraseMatcher:
+        """Get the shared compiled matcher for title exclusion keywords"""
+        return get_phrase_matcher(self._config_data.get('content_filters', {}).get('title_exclusion_keywords', []))
+    
     def get_classification_config(self) -> Dict[str, Any]:
         """Get classification configuration"""
         return self._config_data.get('classification', {})
@@ -0,0 +1,174 @@
+"""Single-pass multi-keyword matching (Aho-Corasick automaton)"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+def is_word_char(ch: str) -> bool:
+    """Same notion of a word character as ``re``'s Unicode ``\\w``"""
+    return ch.isalnum() or ch == '_'
+
+
+def has_word_boundary(text: str, pos: int) -> bool:
+    """Equivalent of ``re``'s ``\\b`` at ``pos`` in ``text``"""
+    before = pos > 0 and is_word_char(text[pos - 1])
+    after = pos < len(text) and is_word_char(text[pos])
+    return before != after
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a fixed keyword vocabulary
+
+    Keywords are matched literally and case-sensitively; callers lower-case
+    both sides when they need case-insensitive matching. A single scan of the
+    text reports every (possibly overlapping) occurrence of every keyword.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._keyword_ids: Dict[str, int] = {}
+        for keyword in keywords:
+            if keyword and keyword not in self._keyword_ids:
+                self._keyword_ids[keyword] = len(self.keywords)
+                self.keywords.append(keyword)
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._build()
+
+    def _build(self):
+        """Build the trie and its failure links"""
+        for keyword_id, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(keyword_id)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                if state:
+                    fallback = self._fail[state]
+                    while fallback and ch not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[next_state] = self._goto[fallback].get(ch, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield ``(start, keyword)`` for every occurrence, ordered by end position"""
+        goto, fail, output, keywords = self._goto, self._fail, self._output, self.keywords
+        state = 0
+        for end, ch in enumerate(text, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword_id in output[state]:
+                keyword = keywords[keyword_id]
+                yield end - len(keyword), keyword
+
+    def count(self, text: str) -> Dict[str, Tuple[int, int]]:
+        """Count every keyword found in ``text``
+
+        Returns ``{keyword: (bounded, plain)}`` where ``plain`` equals
+        ``text.count(keyword)`` and ``bounded`` equals
+        ``len(re.findall(r'\\b' + re.escape(keyword) + r'\\b', text))``.
+        Both are non-overlapping leftmost counts, derived from one scan.
+        """
+        counts: Dict[str, List[int]] = {}
+        plain_end: Dict[str, int] = {}
+        bounded_end: Dict[str, int] = {}
+
+        for start, keyword in self.iter_matches(text):
+            entry = counts.get(keyword)
+            if entry is None:
+                entry = counts[keyword] = [0, 0]
+            end = start + len(keyword)
+
+            if start >= plain_end.get(keyword, 0):
+                entry[1] += 1
+                plain_end[keyword] = end
+
+            if (start >= bounded_end.get(keyword, 0)
+                    and has_word_boundary(text, start) and has_word_boundary(text, end)):
+                entry[0] += 1
+                bounded_end[keyword] = end
+
+        return {keyword: (entry[0], entry[1]) for keyword, entry in counts.items()}
+
+
+class PhraseMatcher:
+    """Case-insensitive matcher for a list of configured phrases
+
+    Used for portfolio project names and exclusion keywords. Lookups return
+    phrases in their configured order and spelling, and every query is a
+    single scan of the text regardless of how many phrases are configured.
+    """
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases: List[str] = [phrase for phrase in phrases if phrase]
+        # lower-cased phrase -> configured spellings, in config order
+        self._spellings: Dict[str, List[str]] = {}
+        for phrase in self.phrases:
+            self._spellings.setdefault(phrase.lower(), []).append(phrase)
+        self._matcher = KeywordMatcher(self._spellings.keys())
+        self._order = {phrase: i for i, phrase in enumerate(self.phrases)}
+
+        # One alternation for substitutions; longest first so "Oasis Labs"
+        # wins over "Oasis" at the same position
+        alternation = '|'.join(re.escape(phrase) for phrase in sorted(self.phrases, key=len, reverse=True))
+        self._pattern = re.compile(r'\b(?:' + alternation + r')\b', re.IGNORECASE) if self.phrases else None
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def contains_any(self, text: str) -> bool:
+        """True if any phrase occurs as a substring of ``text``"""
+        for _ in self._matcher.iter_matches(text.lower()):
+            return True
+        return False
+
+    def find_words(self, text: str) -> List[str]:
+        """Phrases occurring in ``text`` as whole words (``\\b`` on both sides)"""
+        text = text.lower()
+        found = set()
+        for start, phrase in self._matcher.iter_matches(text):
+            if phrase not in found and has_word_boundary(text, start) \
+                    and has_word_boundary(text, start + len(phrase)):
+                found.add(phrase)
+
+        matches = [spelling for phrase in found for spelling in self._spellings[phrase]]
+        matches.sort(key=self._order.get)
+        return matches
+
+    def highlight(self, text: str, template: str) -> str:
+        """Replace whole-word occurrences with ``template.format(phrase)`` in one pass"""
+        if self._pattern is None:
+            return text
+        return self._pattern.sub(
+            lambda match: template.format(self._spellings.get(match.group(0).lower(), [match.group(0)])[0]), text
+        )
+
+
+@lru_cache(maxsize=32)
+def _build_phrase_matcher(phrases: Tuple[str, ...]) -> PhraseMatcher:
+    return PhraseMatcher(phrases)
+
+
+def get_phrase_matcher(phrases: Iterable[str]) -> PhraseMatcher:
+    """Shared matcher for a phrase list, built once per distinct list"""
+    return _build_phrase_matcher(tuple(phrases))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+测试TF-IDF去重的分块稀疏实现与原始全量两两比较结果一致
+"""
+
+import io
+import random
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from sklearn.metrics.pairwise import cosine_similarity
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.services.adaptive_deduplication_service import AdaptiveDeduplicationService, AdaptiveStats
+from src.services.sparse_similarity import blockwise_cosine_similarity
+
+MODES = ('speed', 'accuracy', 'balanced', 'aggressive')
+THRESHOLDS = (0.4, 0.6)
+
+
+def mixed_corpus(n=300, seed=7):
+    """中英文融资快讯（同一事件多种写法）与普通新闻混合的语料"""
+    r = random.Random(seed)
+    companies = [f'{a}{b}' for a in ['Alpha', 'Nova', 'Zen', 'Orbit', 'Flux', 'Pixel', 'Terra', 'Quant']
+                 for b in ['', 'Labs', 'Protocol', 'Chain', 'Pay']]
+    institutions = ['贝莱德', '富达', '币安', '灰度', '微策略', '高盛']
+    investors = ['Paradigm', 'a16z', 'Coinbase Ventures', 'Binance Labs']
+    rounds = [('种子轮', 'seed'), ('A轮', 'Series A'), ('B轮', 'Series B'), ('战略', 'strategic')]
+    funding = ['{c} 完成 {a} 万美元{r}融资', '{c}完成{a}万美元{r}融资，{i} 领投', '加密项目 {c} 宣布完成 {a} 万美元{r}融资',
+               '{c} raises ${m}M {e} round led by {i}', '{c} secures {m} million in {e} funding',
+               '{i} 领投 {c} {r} 融资', '融资快讯 | {c} 获 {a} 万美元 {r} 融资']
+    news = ['{c} 上线主网并推出代币激励计划', '{x}增持比特币，持仓达 {a} 枚', '{x}推出{c}现货ETF',
+            '{c} 遭黑客攻击，损失约 {a} 万美元', '{c} 宣布空投计划，总量 {a} 万枚代币', '{x} 发布 {c} 季度报告']
+
+    articles = []
+    while len(articles) < n:
+        c, x, i = r.choice(companies), r.choice(institutions), r.choice(investors)
+        m = r.choice([1, 2, 3, 5, 8, 10, 15, 20])
+        rd, en = r.choice(rounds)
+        templates = funding if r.random() < 0.6 else [r.choice(news)]
+        for _ in range(r.randint(1, 4)):
+            title = r.choice(templates).format(c=c, a=m * 100, m=m, r=rd, e=en, i=r.choice([i, r.choice(investors)]), x=x)
+            content = r.choice(['', f'{title}。{x}表示将继续关注该领域。' * 3])
+            articles.append({'title': title, 'content': content})
+    r.shuffle(articles)
+    return articles[:n]
+
+
+def reference_tfidf_vectorized(service, articles):
+    """原始实现：稠密余弦矩阵 + 每对都计算 max(增强相似度, TF-IDF * 0.8)"""
+    unique, _ = service._hash_only_dedup(articles, AdaptiveStats())
+    titles = [service._clean_title(a.get('title', '')) for a in unique]
+    similarity_matrix = cosine_similarity(service.tfidf_vectorizer.fit_transform(titles))
+
+    duplicates = set()
+    for i in range(len(unique)):
+        if i in duplicates:
+            continue
+        for j in range(i + 1, len(unique)):
+            if j in duplicates:
+                continue
+            enhanced = service._calculate_enhanced_similarity(unique[i].get('title', ''), unique[j].get('title', ''))
+            if max(enhanced, similarity_matrix[i, j] * 0.8) >= service.similarity_threshold:
+                duplicates.add(j)
+    return [unique[i] for i in range(len(unique)) if i not in duplicates]
+
+
+def reference_layer_tfidf(service, articles):
+    """原始实现：稠密余弦矩阵上的全量两两比较，保留标题较长的一篇"""
+    threshold = service.thresholds.get('tfidf_threshold', 0.5)
+    category = getattr(service, 'current_category', '').lower()
+    if any(keyword in category for keyword in ['融资', '基金', 'funding', 'investment']):
+        threshold = max(0.25, threshold - 0.15)
+
+    texts = []
+    for article in articles:
+        title = article.get('title', '')
+        text = f"{title} {title} {title}"
+        if article.get('content'):
+            text += f" {article['content'][:200]}"
+        texts.append(text)
+    similarity_matrix = cosine_similarity(service.tfidf_vectorizer.fit_transform(texts))
+
+    to_remove = set()
+    for i in range(len(articles)):
+        if i in to_remove:
+            continue
+        for j in range(i + 1, len(articles)):
+            if j in to_remove or similarity_matrix[i, j] < threshold:
+                continue
+            if len(articles[i].get('title', '')) >= len(articles[j].get('title', '')):
+                to_remove.add(j)
+            else:
+                to_remove.add(i)
+                break
+    return [articles[i] for i in range(len(articles)) if i not in to_remove]
+
+
+def make_service(mode, threshold):
+    with redirect_stdout(io.StringIO()):
+        return AdaptiveDeduplicationService(similarity_threshold=threshold, performance_mode=mode)
+
+
+def same_articles(left, right):
+    return [id(a) for a in left] == [id(a) for a in right]
+
+
+def test_blockwise_matches_dense_cosine():
+    """分块稀疏结果与稠密float64余弦矩阵在阈值处的取舍完全一致"""
+    service = make_service('balanced', 0.6)
+    matrix = service.tfidf_vectorizer.fit_transform([a['title'] for a in mixed_corpus()])
+    dense = cosine_similarity(matrix)
+    for threshold in (0.0, 0.25, 0.4, 0.6, 0.85):
+        sparse_result = blockwise_cosine_similarity(matrix, threshold, block_rows=37)
+        expected = {(i, j) for i, j in zip(*dense.nonzero()) if j > i and dense[i, j] >= threshold}
+        assert set(zip(sparse_result.row.tolist(), sparse_result.col.tolist())) == expected
+
+
+def test_tfidf_vectorized_dedup_matches_reference():
+    articles = mixed_corpus()
+    for mode in MODES:
+        for threshold in THRESHOLDS:
+            service = make_service(mode, threshold)
+            with redirect_stdout(io.StringIO()):
+                result, _ = service._tfidf_vectorized_dedup(articles, AdaptiveStats())
+            assert same_articles(result, reference_tfidf_vectorized(service, articles)), (mode, threshold)
+
+
+def test_layer_tfidf_dedup_matches_reference():
+    articles = mixed_corpus()
+    for mode in MODES:
+        for category in ('', '融资'):
+            service = make_service(mode, 0.6)
+            service.current_category = category
+            with redirect_stdout(io.StringIO()):
+                result = service._layer_tfidf_dedup(articles, AdaptiveStats())
+            assert same_articles(result, reference_layer_tfidf(service, articles)), (mode, category)
+
+
+if __name__ == "__main__":
+    for test in (test_blockwise_matches_dense_cosine, test_tfidf_vectorized_dedup_matches_reference,
+                 test_layer_tfidf_dedup_matches_reference):
+        test()
+        print(f"✓ {test.__name__}")
@@ -7,12 +7,13 @@ import json
 import re
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
 from html import unescape
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
 
@@ -31,6 +32,7 @@ HEADERS = {"User-Agent": "IOSG-RSS-Fetcher/3.0 (+https://iosg.vc)"}
 REQUEST_TIMEOUT = 15
 FILTER_DAYS = 7
 DEFAULT_OUTPUT = Path("tools/rss_fetcher/latest_feeds.json")
+DEFAULT_WORKERS = 8
 
 ATOM_NS = "{http://www.w3.org/2005/Atom}"
 DC_NS = "{http://purl.org/dc/elements/1.1/}"
@@ -54,6 +56,9 @@ class FeedFetchResult:
     url: str
     entries: List[RawEntry]
     error: Optional[str] = None
+    not_modified: bool = False
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
 
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
@@ -84,11 +89,29 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         default=0,
         help="Polling interval in seconds; when >0 the script loops until stopped.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of feeds fetched concurrently (default: {DEFAULT_WORKERS}).",
+    )
     parser.add_argument(
         "--raw",
         action="store_true",
         help="Prefer full HTML content when available (default falls back to summaries).",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help=f"Parse feeds incrementally and stop reading once entries are older than {FILTER_DAYS} days.",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        default=None,
+        help="Directory of an append-only day-partitioned JSONL article store; "
+        "the output file is then only rewritten when the store changes.",
+    )
     parser.add_argument(
         "--quiet",
         action="store_true",
@@ -117,9 +140,37 @@ def parse_datetime(value: Optional[str]) -> Optional[datetime]:
     return dt
 
 
-def extract_link(node) -> str:
+ENTRY_TAGS = ("item", f"{ATOM_NS}entry", "entry")
+STREAM_CHUNK_SIZE = 64 * 1024
+# Streaming mode stops after this many consecutive entries older than the cutoff,
+# which tolerates feeds that are only roughly sorted by date.
+EARLY_STOP_OLD_ENTRIES = 3
+
+Children = Dict[str, List[Any]]
+
+
+def index_children(node) -> Children:
+    """Group direct children by tag so each field lookup is a dict hit."""
+    children: Children = {}
+    for child in node:
+        children.setdefault(child.tag, []).append(child)
+    return children
+
+
+def first_text(children: Children, *tags: str) -> Optional[str]:
+    """Equivalent of ``node.findtext(a) or node.findtext(b) or ...``."""
+    for tag in tags:
+        elems = children.get(tag)
+        if elems:
+            text = elems[0].text or ""
+            if text:
+                return text
+    return None
+
+
+def extract_link(children: Children) -> str:
     for tag in ("link", f"{ATOM_NS}link"):
-        for elem in node.findall(tag):
+        for elem in children.get(tag, []):
             href = elem.get("href")
             if href and href.strip():
                 return href.strip()
@@ -127,23 +178,24 @@ def extract_link(node) -> str:
                 return elem.text.strip()
 
     for tag in ("guid", f"{ATOM_NS}id"):
-        guid = node.findtext(tag)
+        guid = first_text(children, tag)
         if guid and guid.strip():
             return guid.strip()
 
     return ""
 
 
-def extract_author(node) -> Optional[str]:
+def extract_author(children: Children) -> Optional[str]:
     for tag in ("author", f"{DC_NS}creator"):
-        text = node.findtext(tag)
+        text = first_text(children, tag)
         if text and text.strip():
             return text.strip()
 
-    atom_author = node.find(f"{ATOM_NS}author")
-    if atom_author is not None:
-        name = atom_author.findtext("name") or atom_author.findtext(f"{ATOM_NS}name")
-        email = atom_author.findtext("email") or atom_author.findtext(f"{ATOM_NS}email")
+    atom_author = children.get(f"{ATOM_NS}author")
+    if atom_author:
+        author_node = atom_author[0]
+        name = author_node.findtext("name") or author_node.findtext(f"{ATOM_NS}name")
+        email = author_node.findtext("email") or author_node.findtext(f"{ATOM_NS}email")
         parts = [part.strip() for part in (name, email) if part]
         if parts:
             return " ".join(parts)
@@ -151,16 +203,16 @@ def extract_author(node) -> Optional[str]:
     return None
 
 
-def extract_content(node, include_raw: bool) -> Tuple[str, str]:
-    summary = node.findtext("description") or node.findtext(f"{ATOM_NS}summary") or ""
+def extract_content(children: Children, include_raw: bool) -> Tuple[str, str]:
+    summary = first_text(children, "description", f"{ATOM_NS}summary") or ""
     summary = summary.strip()
 
     content_html = ""
     if include_raw:
         for tag in (f"{CONTENT_NS}encoded", f"{ATOM_NS}content"):
-            elem = node.find(tag)
-            if elem is not None and elem.text and elem.text.strip():
-                content_html = elem.text.strip()
+            elems = children.get(tag)
+            if elems and elems[0].text and elems[0].text.strip():
+                content_html = elems[0].text.strip()
                 break
 
     if not content_html:
@@ -169,6 +221,35 @@ def extract_content(node, include_raw: bool) -> Tuple[str, str]:
     return summary, content_html
 
 
+def entry_from_node(node, include_raw: bool) -> RawEntry:
+    children = index_children(node)
+
+    title = first_text(children, "title", f"{ATOM_NS}title") or ""
+    title = title.strip()
+    link = extract_link(children)
+    guid = first_text(children, "guid", f"{ATOM_NS}id") or link
+    guid = guid.strip() if guid else link
+    summary, content_html = extract_content(children, include_raw)
+
+    published_raw = first_text(
+        children,
+        "pubDate",
+        f"{ATOM_NS}published",
+        f"{ATOM_NS}updated",
+        f"{DC_NS}date",
+    )
+
+    return RawEntry(
+        title=title,
+        link=link,
+        guid=guid,
+        summary=summary,
+        content=content_html,
+        author=extract_author(children),
+        published=parse_datetime(published_raw),
+    )
+
+
 def parse_feed_xml(xml_bytes: bytes, include_raw: bool) -> List[RawEntry]:
     import xml.etree.ElementTree as ET
 
@@ -185,50 +266,148 @@ def parse_feed_xml(xml_bytes: bytes, include_raw: bool) -> List[RawEntry]:
     else:
         nodes = root.findall(".//item") or root.findall(f".//{ATOM_NS}entry")
 
-    entries: List[RawEntry] = []
-
-    for node in nodes:
-        title = node.findtext("title") or node.findtext(f"{ATOM_NS}title") or ""
-        title = title.strip()
-        link = extract_link(node)
-        guid = node.findtext("guid") or node.findtext(f"{ATOM_NS}id") or link
-        guid = guid.strip() if guid else link
-        summary, content_html = extract_content(node, include_raw)
-
-        published_raw = (
-            node.findtext("pubDate")
-            or node.findtext(f"{ATOM_NS}published")
-            or node.findtext(f"{ATOM_NS}updated")
-            or node.findtext(f"{DC_NS}date")
-        )
-        published_dt = parse_datetime(published_raw)
-
-        author = extract_author(node)
-
-        entries.append(
-            RawEntry(
-                title=title,
-                link=link,
-                guid=guid,
-                summary=summary,
-                content=content_html,
-                author=author,
-                published=published_dt,
-            )
-        )
+    return [entry_from_node(node, include_raw) for node in nodes]
+
+
+def iter_feed_entries(
+    chunks: Iterable[bytes],
+    include_raw: bool,
+    cutoff: Optional[datetime] = None,
+) -> Iterator[RawEntry]:
+    """Incrementally parse an RSS/Atom byte stream, yielding entries as they close.
+
+    Finished entries are detached from the tree, so peak memory is bounded by
+    the largest single entry rather than the whole document. With ``cutoff``
+    set, parsing stops after ``EARLY_STOP_OLD_ENTRIES`` consecutive entries
+    published before it. A malformed document yields whatever parsed cleanly.
+    """
+    import xml.etree.ElementTree as ET
 
-    return entries
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: List[Any] = []
+    depth_in_entry = 0
+    old_streak = 0
 
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == "start":
+                    stack.append(elem)
+                    if elem.tag in ENTRY_TAGS or depth_in_entry:
+                        depth_in_entry += 1
+                    continue
+
+                stack.pop()
+                if not depth_in_entry:
+                    continue
+                depth_in_entry -= 1
+                if depth_in_entry:
+                    continue
+
+                entry = entry_from_node(elem, include_raw)
+                if stack:
+                    stack[-1].remove(elem)
+                elem.clear()
+
+                if cutoff is not None and entry.published is not None and entry.published < cutoff:
+                    old_streak += 1
+                    if old_streak >= EARLY_STOP_OLD_ENTRIES:
+                        return
+                    continue
+                old_streak = 0
+                yield entry
+    except ET.ParseError:
+        return
 
-def fetch_feed(name: str, url: str, include_raw: bool) -> FeedFetchResult:
+
+def fetch_feed(
+    name: str,
+    url: str,
+    include_raw: bool,
+    validators: Optional[Dict[str, str]] = None,
+    session: Optional[requests.Session] = None,
+    stream: bool = False,
+) -> FeedFetchResult:
+    headers = dict(HEADERS)
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    http = session or requests
     try:
-        response = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+        response = http.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=stream)
+        if response.status_code == 304:
+            response.close()
+            return FeedFetchResult(
+                name=name,
+                url=url,
+                entries=[],
+                not_modified=True,
+                etag=validators.get("etag") if validators else None,
+                last_modified=validators.get("last_modified") if validators else None,
+            )
         response.raise_for_status()
+        if stream:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=FILTER_DAYS)
+            with response:
+                entries = list(
+                    iter_feed_entries(response.iter_content(STREAM_CHUNK_SIZE), include_raw, cutoff)
+                )
+        else:
+            entries = parse_feed_xml(response.content, include_raw)
     except requests.RequestException as exc:  # noqa: BLE001
         return FeedFetchResult(name=name, url=url, entries=[], error=str(exc))
 
-    entries = parse_feed_xml(response.content, include_raw)
-    return FeedFetchResult(name=name, url=url, entries=entries)
+    return FeedFetchResult(
+        name=name,
+        url=url,
+        entries=entries,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified"),
+    )
+
+
+def fetch_all_feeds(
+    include_raw: bool,
+    http_cache: Optional[Dict[str, Dict[str, str]]] = None,
+    max_workers: int = DEFAULT_WORKERS,
+    stream: bool = False,
+) -> List[FeedFetchResult]:
+    """Fetch every feed on a bounded thread pool; results follow FEEDS order."""
+    http_cache = http_cache if http_cache is not None else {}
+    workers = max(1, min(max_workers, len(FEEDS)))
+
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(fetch_feed, name, url, include_raw, http_cache.get(url), session, stream)
+            for name, url in FEEDS.items()
+        ]
+        return [future.result() for future in futures]
+
+
+def http_cache_path(output: Path) -> Path:
+    return output.with_name(f"{output.stem}.http_cache.json")
+
+
+def load_http_cache(path: Optional[Path]) -> Dict[str, Dict[str, str]]:
+    if path is None or not path.exists():
+        return {}
+
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+    return data if isinstance(data, dict) else {}
+
+
+def save_http_cache(path: Path, http_cache: Dict[str, Dict[str, str]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(http_cache, ensure_ascii=False, indent=2))
 
 
 HTML_TAG_RE = re.compile(r"<[^>]+>")
@@ -318,19 +497,45 @@ def build_payload(
     limit: int,
     include_raw: bool,
     existing_articles: List[Dict[str, Any]],
+    http_cache: Optional[Dict[str, Dict[str, str]]] = None,
+    max_workers: int = DEFAULT_WORKERS,
+    stream: bool = False,
+    store=None,
+    force_export: bool = False,
 ) -> Dict[str, Any]:
-    existing_ids = {article.get("id") for article in existing_articles if article.get("id")}
+    """Fetch every feed and assemble the filtered window
+
+    With ``store`` the fetched articles are appended to it and the window is
+    only rebuilt when the store changed (or ``force_export``); otherwise
+    ``payload`` is None and the previous output is still current.
+    """
+    if http_cache is None:
+        http_cache = {}
 
     new_articles: List[Dict[str, Any]] = []
     fetch_counts: Dict[str, int] = {name: 0 for name in FEEDS}
     errors: List[FeedFetchResult] = []
+    not_modified: List[str] = []
 
-    for name, url in FEEDS.items():
-        result = fetch_feed(name, url, include_raw)
+    for result in fetch_all_feeds(include_raw, http_cache, max_workers, stream):
+        name, url = result.name, result.url
         if result.error:
             errors.append(result)
             continue
 
+        if result.etag or result.last_modified:
+            http_cache[url] = {
+                key: value
+                for key, value in (("etag", result.etag), ("last_modified", result.last_modified))
+                if value
+            }
+        else:
+            http_cache.pop(url, None)
+
+        if result.not_modified:
+            not_modified.append(name)
+            continue
+
         entries = result.entries
         if limit > 0:
             entries = entries[:limit]
@@ -338,7 +543,31 @@ def build_payload(
         fetch_counts[name] = len(entries)
         new_articles.extend(to_article(name, url, entry) for entry in entries)
 
-    merged = merge_articles(existing_articles, new_articles)
+    result: Dict[str, Any] = {
+        "payload": None,
+        "errors": errors,
+        "fetch_counts": fetch_counts,
+        "new_articles": 0,
+        "not_modified": not_modified,
+    }
+
+    if store is not None:
+        # The store skips known ids, so the write cost follows the new articles
+        added = store.append(new_articles)
+        expired = store.expire()
+        store.compact_in_background()
+        result["new_articles"] = added
+        if not (added or expired or force_export):
+            return result
+        merged = store.load_window(0)
+    else:
+        existing_ids = {article.get("id") for article in existing_articles if article.get("id")}
+        merged = merge_articles(existing_articles, new_articles)
+        result["new_articles"] = len({
+            article.get("id")
+            for article in new_articles
+            if article.get("id") and article.get("id") not in existing_ids
+        })
 
     cutoff_dt = datetime.now(timezone.utc) - timedelta(days=FILTER_DAYS)
     cutoff_ts = int(cutoff_dt.timestamp())
@@ -355,13 +584,6 @@ def build_payload(
         if feed_name in feed_stats:
             feed_stats[feed_name] += 1
 
-    new_unique_ids = {
-        article.get("id")
-        for article in new_articles
-        if article.get("id") and article.get("id") not in existing_ids
-    }
-    new_unique_count = len(new_unique_ids)
-
     metadata = {
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "total_articles": total_articles,
@@ -373,15 +595,11 @@ def build_payload(
         "target_feeds": list(FEEDS.keys()),
     }
 
-    return {
-        "payload": {
-            "metadata": metadata,
-            "articles": filtered,
-        },
-        "errors": errors,
-        "fetch_counts": fetch_counts,
-        "new_articles": new_unique_count,
+    result["payload"] = {
+        "metadata": metadata,
+        "articles": filtered,
     }
+    return result
 
 
 def print_summary(result: Dict[str, Any], quiet: bool) -> None:
@@ -389,10 +607,18 @@ def print_summary(result: Dict[str, Any], quiet: bool) -> None:
         return
 
     payload = result["payload"]
-    metadata = payload["metadata"]
     errors: List[FeedFetchResult] = result["errors"]
     fetch_counts: Dict[str, int] = result.get("fetch_counts", {})
     new_articles = result.get("new_articles", 0)
+    not_modified = set(result.get("not_modified", []))
+
+    if payload is None:
+        print(f"No new articles this round ({sum(fetch_counts.values())} fetched, {len(not_modified)} feeds not modified).")
+        for error in errors:
+            print(f"  ✗ {error.name}: {error.error}")
+        return
+
+    metadata = payload["metadata"]
 
     print(
         "Generated at {generated_at}: {total} articles kept (added {new_articles}, filtered {filtered_out} of {original}).".format(
@@ -407,7 +633,10 @@ def print_summary(result: Dict[str, Any], quiet: bool) -> None:
     for feed in FEEDS:
         total_count = metadata["feeds_stats"].get(feed, 0)
         fetched = fetch_counts.get(feed, 0)
-        print(f"  - {feed}: {total_count} kept / {fetched} fetched this round")
+        if feed in not_modified:
+            print(f"  - {feed}: {total_count} kept / not modified this round")
+        else:
+            print(f"  - {feed}: {total_count} kept / {fetched} fetched this round")
 
     if errors:
         print("Errors:")
@@ -422,6 +651,19 @@ def save_output(path: Path, payload: Dict[str, Any], quiet: bool) -> None:
         print(f"Saved aggregated data to {path}")
 
 
+def open_store(path: Path, quiet: bool):
+    # The store lives in the main package; make the repository root importable.
+    repo_root = Path(__file__).resolve().parents[2]
+    if str(repo_root) not in sys.path:
+        sys.path.insert(0, str(repo_root))
+    from src.services.article_store import SegmentedArticleStore
+
+    store = SegmentedArticleStore(path, retention_days=FILTER_DAYS)
+    if not quiet:
+        print(f"Using article store {path} ({len(store)} articles)")
+    return store
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     args = parse_args(argv)
 
@@ -429,22 +671,43 @@ def main(argv: Optional[List[str]] = None) -> int:
     include_raw = bool(args.raw)
     output_path: Optional[Path] = None if args.no_save else args.output
 
-    existing_articles = load_existing_articles(args.output)
+    store = open_store(args.store, args.quiet) if args.store else None
+    if store is not None:
+        if not len(store):
+            store.append(load_existing_articles(args.output))
+        existing_articles: List[Dict[str, Any]] = []
+        has_articles = bool(len(store))
+    else:
+        existing_articles = load_existing_articles(args.output)
+        has_articles = bool(existing_articles)
+    cache_path = http_cache_path(args.output)
+    # Validators are only trustworthy while the articles they vouch for exist
+    http_cache = load_http_cache(cache_path) if has_articles else {}
 
     while True:
         result = build_payload(
             limit=args.limit,
             include_raw=include_raw,
             existing_articles=existing_articles,
+            http_cache=http_cache,
+            max_workers=args.workers,
+            stream=args.stream,
+            store=store,
+            force_export=output_path is not None and not output_path.exists(),
         )
         payload = result["payload"]
 
         if output_path is not None:
-            save_output(output_path, payload, quiet=args.quiet)
+            if payload is not None:
+                save_output(output_path, payload, quiet=args.quiet)
+            elif not args.quiet:
+                print(f"No new articles; {output_path} left unchanged")
+            save_http_cache(cache_path, http_cache)
 
         print_summary(result, quiet=args.quiet)
 
-        existing_articles = payload["articles"]
+        if store is None:
+            existing_articles = payload["articles"]
 
         if interval <= 0:
             break